@@ -0,0 +1,56 @@
+from cluster_map.architecture import Size
+from cluster_map.nodes import FleetShape, NodeShape
+
+CEDAR = FleetShape(
+    name="cedar",
+    nodes=[
+        NodeShape(114, gpu="p100.jpg", dimms=4, ram_height=800),
+        NodeShape(32, gpu="p100.jpg", dimms=8, dimm_columns=2, ram_height=800),
+        NodeShape(192, gpu="v100.jpg", dimms=6),
+    ],
+    grid=Size(19, 18),
+)
+BELUGA = FleetShape(
+    name="beluga",
+    nodes=[NodeShape(172, gpu="v100_sxm.jpg", dimms=6)],
+    grid=Size(14, 13),
+)
+NARVAL = FleetShape(
+    name="narval",
+    nodes=[NodeShape(159, gpu="a100_sxm.jpg", dimms=16, dimm_columns=2)],
+    grid=Size(13, 13),
+)
+FLEETS = {fleet.name: fleet for fleet in [CEDAR, BELUGA, NARVAL]}
+
+
+def synthetic_fleet(
+    n_nodes: int,
+    gpus: int = 4,
+    cpus: int = 2,
+    dimms: int = 8,
+    assets: tuple[str, ...] = ("p100.jpg", "v100.jpg", "v100_sxm.jpg", "a100_sxm.jpg"),
+    grid: Size | None = None,
+    size: Size = Size(10000, 10000),
+) -> FleetShape:
+    # Nodes are split evenly between the GPU assets
+    counts = [n_nodes // len(assets)] * len(assets)
+    for i in range(n_nodes % len(assets)):
+        counts[i] += 1
+    dimm_columns = 1 if dimms <= 6 else 2
+    return FleetShape(
+        name=f"synthetic-{n_nodes}",
+        nodes=[
+            NodeShape(
+                count,
+                gpu=asset,
+                gpus=gpus,
+                cpus=cpus,
+                dimms=dimms,
+                dimm_columns=dimm_columns,
+            )
+            for asset, count in zip(assets, counts)
+            if count
+        ],
+        grid=grid,
+        size=size,
+    )
@@ -0,0 +1,140 @@
+import io
+import json
+import platform
+import statistics
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Iterator
+
+from simple_parsing import ArgumentParser
+
+from benchmarks.fleet import FLEETS, synthetic_fleet
+from cluster_map.architecture import (
+    BoundingBox,
+    ComposedObject,
+    Object,
+    Size,
+    asset_cache,
+    instance_cache,
+)
+from cluster_map.nodes import FleetShape, build_cluster
+
+
+@dataclass
+class BenchmarkArgs:
+    # Fleets to benchmark: cedar, beluga, narval or synthetic-<number of nodes>
+    fleets: list[str] = field(default_factory=lambda: ["cedar", "beluga", "narval"])
+    # Width and height of the rendered maps
+    size: int = 4000
+    # Number of repetitions of each measure
+    repeat: int = 3
+    # Path of the JSON results, stdout if not set
+    output: str | None = None
+
+
+def get_fleet(name: str, size: Size) -> FleetShape:
+    if name.startswith("synthetic-"):
+        return synthetic_fleet(int(name.split("-", 1)[1]), size=size)
+    fleet = FLEETS[name]
+    return FleetShape(name=fleet.name, nodes=fleet.nodes, grid=fleet.grid, size=size)
+
+
+def walk(obj: Object, seen: set[int] | None = None) -> Iterator[Object]:
+    # Objects found under several parents are only visited once
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return
+    seen.add(id(obj))
+    yield obj
+    if isinstance(obj, ComposedObject):
+        for child in obj.objects:
+            yield from walk(child, seen)
+    elif isinstance(obj, BoundingBox):
+        yield from walk(obj.object, seen)
+
+
+def adjust_cell_sizes(obj: Object):
+    for composed in walk(obj):
+        if isinstance(composed, ComposedObject):
+            composed.layout.adjust_cell_sizes_from_array(composed.child_sizes)
+
+
+def render(obj: Object):
+    # Start from cold caches, as a new process would
+    for child in walk(obj):
+        child.invalidate()
+    instance_cache.clear()
+    asset_cache.clear()
+    return obj.image
+
+
+def encode(image):
+    with io.BytesIO() as output:
+        image.save(output, format="PNG")
+        return output.tell()
+
+
+def measure(function: Callable, repeat: int) -> list[float]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def summarize(timings: list[float]) -> dict:
+    return {
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "timings": timings,
+    }
+
+
+def benchmark(fleet: FleetShape, repeat: int) -> dict:
+    cluster = build_cluster(fleet)
+    image = render(cluster)
+
+    results = {
+        "construction": measure(lambda: build_cluster(fleet), repeat),
+        "adjust_cell_sizes": measure(lambda: adjust_cell_sizes(cluster), repeat),
+        "render": measure(lambda: render(cluster), repeat),
+        "encode": measure(lambda: encode(image), repeat),
+    }
+
+    return {
+        "fleet": fleet.name,
+        "nodes": fleet.n_nodes,
+        "components": fleet.n_components,
+        "size": list(fleet.size.tuple()),
+        "results": {name: summarize(timings) for name, timings in results.items()},
+    }
+
+
+def main(argv: list[str] | None = None):
+    parser = ArgumentParser(
+        description="Benchmark cluster map construction and rendering"
+    )
+    parser.add_arguments(BenchmarkArgs, dest="args")
+    args: BenchmarkArgs = parser.parse_args(argv).args
+
+    size = Size(args.size, args.size)
+    report = {
+        "python": sys.version,
+        "platform": platform.platform(),
+        "benchmarks": [
+            benchmark(get_fleet(name, size), args.repeat) for name in args.fleets
+        ],
+    }
+
+    if args.output is None:
+        json.dump(report, sys.stdout, indent=2)
+    else:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+import os
+import struct
+import zlib
+from os import PathLike
+from typing import BinaryIO, Iterable, Iterator
+
+import numpy as np
+from PIL import Image
+
+from cluster_map.architecture import Box, Object, Position, Size, channels
+from cluster_map.heatmap import UTILIZATION, Heatmap
+from cluster_map.render import PNGWriter, scanlines
+
+# fcTL operations, frames are kept as is once shown and either replace their
+# region or are alpha blended over it
+DISPOSE_NONE = 0
+BLEND_SOURCE = 0
+BLEND_OVER = 1
+
+
+class APNGWriter(PNGWriter):
+    # Streaming animated PNG encoder, each frame only holds the region that
+    # changed since the previous one. The first frame is the default image.
+    def __init__(
+        self,
+        file: BinaryIO,
+        size: Size,
+        frames: int,
+        loop: int = 0,
+        compress_level: int = 6,
+    ):
+        super().__init__(file, size, compress_level)
+        self.frames = frames
+        self.frame = 0
+        self.sequence = 0
+        self.compress_level = compress_level
+        self.write_chunk(b"acTL", struct.pack(">II", frames, loop))
+
+    def write_frame(
+        self,
+        rows: np.ndarray,
+        position: Position = Position(),
+        duration: int = 100,
+        blend: int = BLEND_SOURCE,
+    ):
+        # `rows` are (height, width, 4) uint8 RGBA pixels at `position` and
+        # `duration` is in milliseconds
+        if self.frame >= self.frames:
+            raise ValueError(f"Too many frames, expected {self.frames}")
+        (height, width) = rows.shape[:2]
+        if self.frame == 0 and (width, height) != self.size.tuple():
+            raise ValueError("The first frame must cover the whole image")
+
+        self.write_chunk(
+            b"fcTL",
+            struct.pack(
+                ">IIIIIHHBB",
+                self.next_sequence(),
+                width,
+                height,
+                position.x,
+                position.y,
+                duration,
+                1000,
+                DISPOSE_NONE,
+                blend,
+            ),
+        )
+        if self.frame == 0:
+            self.write_array(rows)
+            self.write_chunk(b"IDAT", self._compressor.flush())
+        else:
+            data = zlib.compress(scanlines(rows), self.compress_level)
+            self.write_chunk(b"fdAT", struct.pack(">I", self.next_sequence()) + data)
+        self.frame += 1
+
+    def next_sequence(self) -> int:
+        # fcTL and fdAT chunks share the sequence numbers
+        self.sequence += 1
+        return self.sequence - 1
+
+    def close(self):
+        if self.frame != self.frames:
+            raise ValueError(f"Only {self.frame} of {self.frames} frames written")
+        self.write_chunk(b"IEND", b"")
+
+
+def changed_components(values: np.ndarray, previous: np.ndarray) -> np.ndarray:
+    # Indices of the components whose value changed, missing values (NaN) compare
+    # equal to each other
+    same = (values == previous) | (np.isnan(values) & np.isnan(previous))
+    return np.flatnonzero(~same)
+
+
+def union_box(boxes: np.ndarray) -> Box | None:
+    boxes = boxes[(boxes[:, 0] < boxes[:, 2]) & (boxes[:, 1] < boxes[:, 3])]
+    if not len(boxes):
+        return None
+    return (
+        *boxes[:, :2].min(axis=0).tolist(),
+        *boxes[:, 2:].max(axis=0).tolist(),
+    )
+
+
+def iter_frames(
+    heatmap: Heatmap, snapshots: Iterable[np.ndarray]
+) -> Iterator[tuple[Box | None, np.ndarray]]:
+    # Frames of the heatmap over time with the box that changed since the
+    # previous frame, the whole image for the first one and None if nothing
+    # changed. The same (height, width, 4) array is updated in place: only the
+    # components whose value changed are blended again.
+    (height, width) = heatmap.base.shape[:2]
+    frame = heatmap.base.copy()
+    previous = None
+    for values in snapshots:
+        values = np.asarray(values, dtype=float)
+        if previous is None:
+            heatmap.blend(frame, values)
+            box = (0, 0, width, height)
+        else:
+            changed = changed_components(values, previous)
+            heatmap.blend(frame, values, changed)
+            box = union_box(heatmap.boxes[changed])
+        previous = values
+        yield box, frame
+
+
+def save_animation(
+    obj: Object,
+    path: str | PathLike,
+    snapshots: Iterable[np.ndarray],
+    frames: int | None = None,
+    duration: int = 100,
+    scale: float = 1,
+    alpha: float = 0.5,
+    colormap: np.ndarray = UTILIZATION,
+    vmin: float = 0,
+    vmax: float = 1,
+    loop: int = 0,
+    compress_level: int = 6,
+):
+    # Animated heatmap of `obj`, one frame per snapshot of component values (see
+    # Heatmap). The map itself is rendered once, frames only blend the values.
+    # PNG (APNG) files are written frame by frame, `frames` must be given if
+    # `snapshots` has no length. Other formats (GIF, WebP) are left to PIL, which
+    # may keep the frames in memory.
+    heatmap = Heatmap(obj, scale, alpha, colormap, vmin, vmax)
+    (height, width) = heatmap.base.shape[:2]
+
+    if os.path.splitext(path)[1].lower() not in (".png", ".apng"):
+        images = (
+            Image.fromarray(frame.copy())
+            for _, frame in iter_frames(heatmap, snapshots)
+        )
+        first = next(images)
+        first.save(
+            path,
+            save_all=True,
+            append_images=images,
+            duration=duration,
+            loop=loop,
+        )
+        return
+
+    if frames is None:
+        frames = len(snapshots)
+    with open(path, "wb") as file:
+        writer = APNGWriter(file, Size(width, height), frames, loop, compress_level)
+        shown = None
+        for box, frame in iter_frames(heatmap, snapshots):
+            if shown is None:
+                shown = frame.copy()
+                writer.write_frame(frame, duration=duration)
+                continue
+            if box is None:
+                # Frames cannot be skipped, a transparent pixel stands for them
+                writer.write_frame(
+                    np.zeros((1, 1, 4), dtype=np.uint8),
+                    duration=duration,
+                    blend=BLEND_OVER,
+                )
+                continue
+
+            # Compared as packed RGBA pixels
+            (x0, y0, x1, y1) = box
+            rows = frame.view(np.uint32)[y0:y1, x0:x1, 0]
+            previous = shown.view(np.uint32)[y0:y1, x0:x1, 0]
+            changed = rows != previous
+            previous[changed] = rows[changed]
+            blend = BLEND_SOURCE
+            if (channels(rows[changed])[:, 3] == 255).all():
+                # Unchanged pixels become transparent, they compress to almost
+                # nothing when the changed components are scattered
+                rows = np.where(changed, rows, 0).astype(np.uint32)
+                blend = BLEND_OVER
+            writer.write_frame(channels(rows), Position(x0, y0), duration, blend)
+        writer.close()
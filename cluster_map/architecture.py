@@ -1,11 +1,19 @@
+import copy
+import itertools
+import os
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
-from typing import Generic, Literal, TypeVar
+from typing import Callable, Generic, Hashable, Literal, TypeVar
 
 import numpy as np
 from PIL import Image, ImageDraw
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Position:
     x: int = 0
     y: int = 0
@@ -14,7 +22,7 @@ class Position:
         return (self.x, self.y)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Size:
     width: int
     height: int
@@ -23,7 +31,7 @@ class Size:
         return (self.width, self.height)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Padding:
     top: float
     right: float
@@ -34,10 +42,330 @@ class Padding:
         return (self.top, self.right, self.bottom, self.left)
 
 
+Box = tuple[int, int, int, int]
+
+
+def intersect(a: Box, b: Box) -> Box | None:
+    box = (max(a[0], b[0]), max(a[1], b[1]), min(a[2], b[2]), min(a[3], b[3]))
+    if box[0] >= box[2] or box[1] >= box[3]:
+        return None
+    return box
+
+
+class Canvas:
+    # RGBA image covering the absolute region starting at `origin`. Objects draw
+    # into it at absolute positions, restricted to a clipping box.
+    def __init__(
+        self,
+        size: Size,
+        color: tuple[int, ...] = (0, 0, 0, 0),
+        origin: Position | None = None,
+    ):
+        self.image = Image.new("RGBA", size.tuple(), color=color)
+        self.origin = Position() if origin is None else origin
+
+    @classmethod
+    def from_image(cls, image: Image.Image) -> "Canvas":
+        canvas = cls.__new__(cls)
+        canvas.image = image
+        canvas.origin = Position()
+        return canvas
+
+    @property
+    def box(self) -> Box:
+        return (
+            self.origin.x,
+            self.origin.y,
+            self.origin.x + self.image.width,
+            self.origin.y + self.image.height,
+        )
+
+    def local(self, box: Box) -> Box:
+        return (
+            box[0] - self.origin.x,
+            box[1] - self.origin.y,
+            box[2] - self.origin.x,
+            box[3] - self.origin.y,
+        )
+
+    def fill(self, box: Box, color: tuple[int, ...]):
+        box = intersect(box, self.box)
+        if box is not None:
+            self.image.paste(color, self.local(box))
+
+    def paste(self, image: Image.Image, position: Position, clip: Box):
+        box = clip_image(image, position, clip, self.box)
+        if box is None:
+            return
+        if box[2] - box[0] != image.width or box[3] - box[1] != image.height:
+            image = image.crop(
+                (
+                    box[0] - position.x,
+                    box[1] - position.y,
+                    box[2] - position.x,
+                    box[3] - position.y,
+                )
+            )
+        self.image.paste(image, self.local(box)[:2])
+
+    def composite(self, image: Image.Image, position: Position, clip: Box):
+        # Alpha blends the image over the canvas instead of replacing its pixels
+        box = clip_image(image, position, clip, self.box)
+        if box is not None:
+            self.image.alpha_composite(
+                image.convert("RGBA"),
+                self.local(box)[:2],
+                (
+                    box[0] - position.x,
+                    box[1] - position.y,
+                    box[2] - position.x,
+                    box[3] - position.y,
+                ),
+            )
+
+    def crop(self, box: Box) -> Image.Image:
+        return self.image.crop(self.local(box))
+
+
+def clip_image(
+    image: Image.Image, position: Position, clip: Box, canvas: Box
+) -> Box | None:
+    # Part of the image at `position` visible through both boxes
+    box = intersect(
+        (position.x, position.y, position.x + image.width, position.y + image.height),
+        clip,
+    )
+    if box is None:
+        return None
+    return intersect(box, canvas)
+
+
+# Images created from packed pixels share their memory and carry them, array
+# canvases then paste them without converting. PIL copies the memory before the
+# first write to such an image, which is then converted like any other image.
+def shared_image(pixels: np.ndarray) -> Image.Image:
+    image = Image.fromarray(channels(pixels), "RGBA")
+    image.packed_pixels = (image.im, pixels)
+    return image
+
+
+def image_pixels(image: Image.Image) -> np.ndarray:
+    # (height, width) uint32 array, one packed RGBA pixel per item
+    shared = getattr(image, "packed_pixels", None)
+    if shared is not None and shared[0] is image.im:
+        return shared[1]
+
+    rgba_image = image if image.mode == "RGBA" else image.convert("RGBA")
+    return np.asarray(rgba_image).view(np.uint32)[..., 0]
+
+
+def packed_image(image: Image.Image) -> Image.Image:
+    rgba_image = image if image.mode == "RGBA" else image.convert("RGBA")
+    return shared_image(np.array(rgba_image).view(np.uint32)[..., 0])
+
+
+def pack_pixel(color: tuple[int, ...]) -> np.uint32:
+    # Colors without alpha are opaque, like when PIL fills an RGBA image
+    alpha = color[3] if len(color) > 3 else 255
+    return np.array((*color[:3], alpha), dtype=np.uint8).view(np.uint32)[0]
+
+
+def channels(pixels: np.ndarray) -> np.ndarray:
+    return pixels[..., np.newaxis].view(np.uint8)
+
+
+def alpha_composite(destination: np.ndarray, source: np.ndarray):
+    # Vectorized Porter-Duff "over" of straight alpha RGBA arrays, in place. Same
+    # fixed point arithmetic as Image.alpha_composite to match it bit for bit.
+    src_alpha = source[..., 3:].astype(np.uint32)
+    dst_alpha = destination[..., 3:].astype(np.uint32)
+    alpha = src_alpha * 255 + dst_alpha * (255 - src_alpha)
+    src_weight = src_alpha * (255 * 255 << 7) // np.maximum(alpha, 1)
+    dst_weight = (255 << 7) - src_weight
+
+    color = (
+        source[..., :3] * src_weight + destination[..., :3] * dst_weight + (0x80 << 7)
+    )
+    color = (((color >> 8) + color) >> 8) >> 7
+    alpha = alpha + 0x80
+    alpha = ((alpha >> 8) + alpha) >> 8
+
+    # Fully transparent source pixels keep the destination as is
+    visible = src_alpha[..., 0] != 0
+    destination[..., :3][visible] = color[visible]
+    destination[..., 3:][visible] = alpha[visible]
+
+
+class ArrayCanvas(Canvas):
+    # Canvas backed by a preallocated RGBA array. Images are blitted by slicing
+    # packed pixels and the PIL image shares the array memory.
+    def __init__(
+        self,
+        size: Size,
+        color: tuple[int, ...] = (0, 0, 0, 0),
+        origin: Position | None = None,
+    ):
+        self.pixels = np.empty((size.height, size.width), dtype=np.uint32)
+        self.pixels[:] = pack_pixel(color)
+        self.origin = Position() if origin is None else origin
+        self._image = None
+
+    @classmethod
+    def from_image(cls, image: Image.Image) -> "ArrayCanvas":
+        canvas = cls.__new__(cls)
+        canvas.pixels = image_pixels(image).copy()
+        canvas.origin = Position()
+        canvas._image = None
+        return canvas
+
+    @property
+    def array(self) -> np.ndarray:
+        # (height, width, 4) view of the pixels
+        return channels(self.pixels)
+
+    @property
+    def image(self) -> Image.Image:
+        # Created once, later draws show through since the memory is shared
+        if self._image is None:
+            self._image = shared_image(self.pixels)
+        return self._image
+
+    @property
+    def box(self) -> Box:
+        (height, width) = self.pixels.shape
+        return (
+            self.origin.x,
+            self.origin.y,
+            self.origin.x + width,
+            self.origin.y + height,
+        )
+
+    def region(self, box: Box) -> np.ndarray:
+        (x0, y0, x1, y1) = self.local(box)
+        return self.pixels[y0:y1, x0:x1]
+
+    def source(self, image: Image.Image, position: Position, box: Box) -> np.ndarray:
+        return image_pixels(image)[
+            box[1] - position.y : box[3] - position.y,
+            box[0] - position.x : box[2] - position.x,
+        ]
+
+    def fill(self, box: Box, color: tuple[int, ...]):
+        box = intersect(box, self.box)
+        if box is not None:
+            self.region(box)[:] = pack_pixel(color)
+
+    def paste(self, image: Image.Image, position: Position, clip: Box):
+        box = clip_image(image, position, clip, self.box)
+        if box is not None:
+            self.region(box)[:] = self.source(image, position, box)
+
+    def composite(self, image: Image.Image, position: Position, clip: Box):
+        box = clip_image(image, position, clip, self.box)
+        if box is None:
+            return
+        if image.mode == "RGB":
+            self.region(box)[:] = self.source(image, position, box)
+        else:
+            alpha_composite(
+                channels(self.region(box)), channels(self.source(image, position, box))
+            )
+
+    def crop(self, box: Box) -> Image.Image:
+        # Outside of the canvas is transparent, like with Image.crop
+        pixels = np.zeros((box[3] - box[1], box[2] - box[0]), dtype=np.uint32)
+        inside = intersect(box, self.box)
+        if inside is not None:
+            (x0, y0, x1, y1) = inside
+            pixels[y0 - box[1] : y1 - box[1], x0 - box[0] : x1 - box[0]] = self.region(
+                inside
+            )
+        return shared_image(pixels)
+
+
+# Type of the canvases objects render into, ArrayCanvas (NumPy operations) or
+# Canvas (PIL operations). Kept as a module global like render_observer.
+canvas_type: type[Canvas] = ArrayCanvas
+
+
+def new_canvas(
+    size: Size, color: tuple[int, ...] = (0, 0, 0, 0), origin: Position | None = None
+) -> Canvas:
+    return canvas_type(size, color, origin)
+
+
+# Notified around renders and draws when set, see cluster_map.instrument. Kept as
+# a module global so that disabled instrumentation costs a single lookup.
+render_observer = None
+
+
+def observe_render(obj: "Object", render: Callable[[], Image.Image]) -> Image.Image:
+    observer = render_observer
+    if observer is None:
+        return render()
+
+    image = None
+    observer.start(obj, "render")
+    try:
+        image = render()
+    finally:
+        observer.stop(image)
+    return image
+
+
+def observe_draw(obj: "Object", canvas: Canvas, position: Position, clip: Box):
+    observer = render_observer
+    observer.start(obj, "draw", position, clip)
+    try:
+        obj.draw(canvas, position, clip)
+    finally:
+        observer.stop()
+
+
+# Tokens of objects without a structure of their own, unlike ids they are never
+# reused once the object is collected. Copies and unpickled objects get a new one.
+instance_tokens = itertools.count()
+
+# Attributes holding render state rather than style, setting them must not
+# invalidate the memoized image.
+RENDER_STATE_ATTRIBUTES = frozenset(
+    [
+        "_cached_image",
+        "_structure_key",
+        "_token",
+        "_parents",
+        "_child_sizes",
+        "_child_indices",
+        "_canvas",
+        "_dirty_boxes",
+    ]
+)
+
+
 @dataclass(kw_only=True)
 class Object:
     name: str
     _size: Size | None = None
+    _cached_image: Image.Image | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _structure_key: Hashable | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _token: int = field(
+        default_factory=instance_tokens.__next__, init=False, repr=False, compare=False
+    )
+    # Keyed by id, an object shared by many parents is adopted in constant time.
+    # Parents are weakly referenced, children do not keep them (and their images)
+    # alive once they are discarded.
+    _parents: dict[int, weakref.ref] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if name not in RENDER_STATE_ATTRIBUTES:
+            self.invalidate()
 
     @property
     def size(self) -> Size | None:
@@ -49,45 +377,384 @@ class Object:
 
     @property
     def image(self) -> Image.Image:
+        # The memoized image is shared by all callers and must not be modified,
+        # copy it before drawing on it
+        if self._cached_image is None:
+            self._cached_image = observe_render(self, self.render)
+        return self._cached_image
+
+    def render(self) -> Image.Image:
+        ...
+
+    def draw(self, canvas: Canvas, position: Position, clip: Box):
+        canvas.paste(self.image, position, clip)
+
+    # Instancing splits the rendering in a body, shared by all objects with the same
+    # structure key, and per-instance overlays (ex: labels) drawn on top of it.
+    def render_body(self) -> Image.Image:
+        return self.render()
+
+    def draw_overlay(self, canvas: Canvas, position: Position, clip: Box):
         ...
 
+    @property
+    def structure_key(self) -> Hashable:
+        if self._structure_key is None:
+            self._structure_key = self.compute_structure_key()
+        return self._structure_key
+
+    def compute_structure_key(self) -> Hashable:
+        # Unknown objects are never considered identical.
+        return (type(self), self._token)
+
+    @property
+    def overlay_key(self) -> Hashable:
+        return None
+
+    def invalidate(self):
+        # Any attribute assignment lands here. In-place mutations (ex: appending to
+        # `ComposedObject.objects`) are not detected and must call it explicitly.
+        self.__dict__["_cached_image"] = None
+        self.__dict__["_structure_key"] = None
+        parents = self.__dict__.get("_parents", {})
+        for key, ref in list(parents.items()):
+            parent = ref()
+            if parent is None:
+                del parents[key]
+            else:
+                parent.child_invalidated(self)
+
+    def child_invalidated(self, child: "Object"):
+        self.invalidate()
+
+    # Pickled objects only carry their description, render state and links to
+    # parents are rebuilt on the other side.
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_cached_image"] = None
+        state["_structure_key"] = None
+        state["_parents"] = {}
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.__dict__["_token"] = next(instance_tokens)
+
+    def __deepcopy__(self, memo: dict) -> "Object":
+        # Independent copy of the object tree (ex: nodes of the same type), solved
+        # layouts are copied rather than solved again.
+        clone = type(self).__new__(type(self))
+        memo[id(self)] = clone
+        clone.__setstate__(copy_state(self.__getstate__(), memo))
+        return clone
+
+    def adopt(self, old_children: list["Object"], new_children: list["Object"]):
+        for child in old_children:
+            child._parents.pop(id(self), None)
+        for child in new_children:
+            child._parents[id(self)] = weakref.ref(self)
+
 
 @dataclass(kw_only=True)
 class Rectangle(Object):
     color: tuple[int, int, int, int] = (255, 0, 0, 255)
 
-    @property
-    def image(self) -> Image.Image:
+    def render(self) -> Image.Image:
         assert self.size is not None
         return Image.new("RGB", self.size.tuple(), color=self.color)
 
+    def draw(self, canvas: Canvas, position: Position, clip: Box):
+        assert self.size is not None
+        box = (
+            position.x,
+            position.y,
+            position.x + self.size.width,
+            position.y + self.size.height,
+        )
+        box = intersect(box, clip)
+        if box is not None:
+            # RGB rectangles are opaque once pasted on RGBA images
+            canvas.fill(box, (*self.color[:3], 255))
+
+    def compute_structure_key(self) -> Hashable:
+        assert self.size is not None
+        return (type(self), self.size.tuple(), self.color)
+
 
 T = TypeVar("T", bound=Object)
 
 
-image_cache = {}
+def image_nbytes(image: Image.Image) -> int:
+    return image.width * image.height * len(image.getbands())
+
+
+class ImageCache:
+    # Thread-safe, images are created outside of the lock so that concurrent
+    # misses on different keys do not wait on each other. Packed caches store
+    # images as packed RGBA pixels (see shared_image), their pixels are then
+    # counted in the budget rather than kept in a copy on the side.
+    def __init__(self, max_bytes: int = 512 * 2**20, packed: bool = False):
+        self._images: OrderedDict[Hashable, Image.Image] = OrderedDict()
+        self._lock = threading.RLock()
+        self._max_bytes = max_bytes
+        self.packed = packed
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def max_bytes(self) -> int:
+        return self._max_bytes
+
+    @max_bytes.setter
+    def max_bytes(self, max_bytes: int):
+        with self._lock:
+            self._max_bytes = max_bytes
+            self._evict()
+
+    def __len__(self) -> int:
+        return len(self._images)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._images
+
+    def get(self, key: Hashable, create: Callable[[], Image.Image]) -> Image.Image:
+        with self._lock:
+            image = self._images.get(key)
+            if image is not None:
+                self._images.move_to_end(key)
+                self.hits += 1
+                return image
+            self.misses += 1
+
+        image = create()
+        if self.packed:
+            image = packed_image(image)
+
+        with self._lock:
+            # Another thread may have created it meanwhile
+            existing = self._images.get(key)
+            if existing is not None:
+                return existing
+            self._images[key] = image
+            self.nbytes += image_nbytes(image)
+            self._evict(keep=key)
+        return image
+
+    def clear(self):
+        with self._lock:
+            self._images.clear()
+            self.nbytes = 0
+
+    def _evict(self, keep: Hashable | None = None):
+        # The image just created is kept even if it exceeds the budget on its own.
+        while self.nbytes > self.max_bytes and self._images:
+            key = next(iter(self._images))
+            if key == keep:
+                break
+            image = self._images.pop(key)
+            self.nbytes -= image_nbytes(image)
+            self.evictions += 1
+
+
+IMAGE_FOLDER = os.path.join(os.path.dirname(os.path.dirname(__file__)), "images")
+
+
+@dataclass
+class AssetStats:
+    decode_time: float
+    nbytes: int
+
+
+class AssetLoader:
+    # Source images are decoded eagerly and their file handle closed right away.
+    def __init__(self, max_bytes: int = 512 * 2**20):
+        self.cache = ImageCache(max_bytes)
+        self.stats: dict[str, AssetStats] = {}
+        self._lock = threading.Lock()
+
+    def open(self, image_path: str) -> Image.Image:
+        image_path = os.fspath(image_path)
+        return self.cache.get(image_path, lambda: self.decode(image_path))
+
+    def decode(self, image_path: str) -> Image.Image:
+        start = time.perf_counter()
+        with Image.open(image_path) as image:
+            image.load()
+        with self._lock:
+            self.stats[image_path] = AssetStats(
+                decode_time=time.perf_counter() - start, nbytes=image_nbytes(image)
+            )
+        return image
+
+    def preload(
+        self,
+        folder: str = IMAGE_FOLDER,
+        extensions: tuple[str, ...] = (".png", ".jpg", ".jpeg"),
+        workers: int | None = None,
+    ) -> dict[str, AssetStats]:
+        paths = sorted(
+            os.path.join(folder, filename)
+            for filename in os.listdir(folder)
+            if filename.lower().endswith(extensions)
+        )
+        # Pillow releases the GIL while decoding
+        with ThreadPoolExecutor(workers) as executor:
+            list(executor.map(self.open, paths))
+
+        return {path: self.stats[path] for path in paths if path in self.stats}
+
+    @property
+    def nbytes(self) -> int:
+        return self.cache.nbytes
+
+
+asset_loader = AssetLoader()
 
 
 def open_image(image_path: str) -> Image.Image:
-    if image_path not in image_cache:
-        image_cache[image_path] = Image.open(image_path)
+    return asset_loader.open(image_path)
+
+
+# Resized assets are pasted as is, instance bodies are already canvas pixels
+asset_cache = ImageCache(packed=True)
+instance_cache = ImageCache()
+
+
+def get_asset(
+    image_path: str,
+    rotation: float = 0,
+    size: tuple[int, int] | None = None,
+    resample: Image.Resampling | None = None,
+) -> Image.Image:
+    image_path = os.fspath(image_path)
+    rotation = rotation % 360
+
+    def create():
+        if size is not None:
+            return get_asset(image_path, rotation).resize(size, resample)
+        return open_image(image_path).rotate(rotation, expand=True)
+
+    if size is None and not rotation:
+        # Source images are held by the asset loader
+        return open_image(image_path)
 
-    return image_cache[image_path]
+    return asset_cache.get((image_path, rotation, size, resample), create)
+
+
+# Levels of detail, picked from the largest side of an object once drawn. Objects
+# up to their glyph size are drawn as a flat color and up to their thumbnail size
+# they are resampled from a pre-shrunk copy of their asset.
+GLYPH_SIZE = 8
+THUMBNAIL_SIZE = 128
+
+
+def get_glyph_color(image_path: str, rotation: float = 0) -> tuple[int, ...]:
+    return get_asset(image_path, rotation, (1, 1), Image.Resampling.BOX).getpixel(
+        (0, 0)
+    )
+
+
+def get_thumbnail(image_path: str, rotation: float, thumbnail_size: int) -> Image.Image:
+    # Twice the thumbnail size to keep some details after the final resampling
+    (width, height) = get_asset(image_path, rotation).size
+    ratio = min(1, 2 * thumbnail_size / max(width, height))
+    size = (max(1, round(width * ratio)), max(1, round(height * ratio)))
+    return get_asset(image_path, rotation, size, Image.Resampling.BOX)
+
+
+def get_asset_detail(
+    image_path: str,
+    rotation: float,
+    size: tuple[int, int],
+    resample: Image.Resampling | None = None,
+    glyph_size: int = GLYPH_SIZE,
+    thumbnail_size: int = THUMBNAIL_SIZE,
+) -> Image.Image:
+    image_path = os.fspath(image_path)
+    rotation = rotation % 360
+
+    if max(size) <= glyph_size:
+
+        def create():
+            color = get_glyph_color(image_path, rotation)
+            return Image.new(get_asset(image_path).mode, size, color)
+
+        return asset_cache.get((image_path, rotation, size, "glyph"), create)
+
+    if max(size) <= thumbnail_size:
+
+        def create():
+            thumbnail = get_thumbnail(image_path, rotation, thumbnail_size)
+            return thumbnail.resize(size, resample)
+
+        return asset_cache.get(
+            (image_path, rotation, size, resample, "thumbnail", thumbnail_size),
+            create,
+        )
+
+    return get_asset(image_path, rotation, size, resample)
 
 
 @dataclass(kw_only=True)
 class ImageObject(Object):
     image_path: str
+    resample: Image.Resampling | None = None
+    rotation: float = 0
+    glyph_size: int = GLYPH_SIZE
+    thumbnail_size: int = THUMBNAIL_SIZE
     _image: Image.Image = field(init=False)
 
     def __post_init__(self):
-        self._image = open_image(self.image_path)
+        # Rotated variants are shared through the asset cache
+        self._image = get_asset(self.image_path, self.rotation)
         self._size = Size(*self._image.size)
 
-    @property
-    def image(self) -> Image.Image:
+    def __getstate__(self):
+        state = super().__getstate__()
+        del state["_image"]
+        return state
+
+    def __setstate__(self, state):
+        super().__setstate__(state)
+        self.__dict__["_image"] = get_asset(self.image_path, self.rotation)
+
+    def __deepcopy__(self, memo: dict) -> "ImageObject":
+        # Only immutable attributes, the asset is shared
+        clone = type(self).__new__(type(self))
+        memo[id(self)] = clone
+        clone.__dict__.update(
+            self.__dict__,
+            _cached_image=None,
+            _structure_key=None,
+            _token=next(instance_tokens),
+            _parents={},
+        )
+        return clone
+
+    def render(self) -> Image.Image:
         assert self.size is not None
-        return self._image.resize(self.size.tuple())
+        return get_asset_detail(
+            self.image_path,
+            self.rotation,
+            self.size.tuple(),
+            self.resample,
+            self.glyph_size,
+            self.thumbnail_size,
+        )
+
+    def compute_structure_key(self) -> Hashable:
+        assert self.size is not None
+        return (
+            type(self),
+            os.fspath(self.image_path),
+            self.rotation % 360,
+            self.size.tuple(),
+            self.resample,
+            self.glyph_size,
+            self.thumbnail_size,
+        )
 
     @property
     def size(self) -> Size | None:
@@ -95,7 +762,7 @@ class ImageObject(Object):
 
     @size.setter
     def size(self, size: Size):
-        (width, height) = self._image.size
+        width, height = self._image.size
         ratio = width / height
         if not np.isclose(size.width / size.height, ratio, rtol=10e-2):
             raise ValueError(
@@ -104,10 +771,14 @@ class ImageObject(Object):
         self._size = size
 
     def rotate(self, degrees):
-        new_image_object = type(self)(name=self.name, image_path=self.image_path)
-        new_image_object._image = self._image.rotate(degrees, expand=True)
-        new_image_object._size = Size(*new_image_object._image.size)
-        return new_image_object
+        return type(self)(
+            name=self.name,
+            image_path=self.image_path,
+            resample=self.resample,
+            rotation=self.rotation + degrees,
+            glyph_size=self.glyph_size,
+            thumbnail_size=self.thumbnail_size,
+        )
 
 
 @dataclass(kw_only=True)
@@ -123,11 +794,23 @@ class CPU(ImageObject):
 @dataclass(kw_only=True)
 class RAM(ImageObject):
     # quantity: int
-    ...
+    rotation: float = 90
+
+
+def size_array(size: Size | None) -> tuple[float, float]:
+    if size is None:
+        return (np.nan, np.nan)
+    return (size.width, size.height)
 
-    def __post_init__(self):
-        self._image = open_image(self.image_path).rotate(90, expand=True)
-        self._size = Size(*self._image.size)
+
+def object_sizes(objects: list[Object]) -> np.ndarray:
+    return np.array([size_array(obj.size) for obj in objects], dtype=float).reshape(
+        -1, 2
+    )
+
+
+# Cached results of the layout, setting them does not change the layout.
+LAYOUT_STATE_ATTRIBUTES = frozenset(["_owners", "_positions", "_sizes"])
 
 
 class Layout:
@@ -139,6 +822,10 @@ class Layout:
         halign: Literal["left", "center", "right"] = "left",
         padding: Padding | None = None,
     ):
+        # Weakly referenced like the parents of objects
+        self._owners: list[weakref.ref] = []
+        self._positions: np.ndarray | None = None
+        self._sizes: np.ndarray | None = None
         self.grid = grid
         self._size = size
         self.valign = valign
@@ -151,6 +838,44 @@ class Layout:
         self.heights = np.zeros(self.grid.tuple()[::-1])
         self.widths = np.zeros(self.grid.tuple()[::-1])
 
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if name not in LAYOUT_STATE_ATTRIBUTES:
+            self.__dict__["_positions"] = None
+            self.__dict__["_sizes"] = None
+            for ref in self._owners:
+                owner = ref()
+                if owner is not None:
+                    owner.invalidate()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_owners"] = []
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+
+    def __deepcopy__(self, memo: dict) -> "Layout":
+        # Arrays are replaced rather than updated in place, they are shared until
+        # the layout is solved again. Solved positions are kept.
+        clone = type(self).__new__(type(self))
+        memo[id(self)] = clone
+        clone.__dict__.update(self.__dict__, _owners=[])
+        return clone
+
+    def attach(self, owner: Object):
+        self.detach(owner)
+        self._owners.append(weakref.ref(owner))
+
+    def detach(self, owner: Object):
+        # Owners that were discarded are dropped on the way
+        self.__dict__["_owners"] = [
+            ref
+            for ref in self._owners
+            if (other := ref()) is not None and other is not owner
+        ]
+
     @property
     def size(self):
         return self._size
@@ -159,7 +884,31 @@ class Layout:
     def size(self, size: Size):
         self._size = size
 
+    def structure_key(self) -> Hashable:
+        return (
+            type(self),
+            self.grid.tuple(),
+            self.size.tuple(),
+            self.valign,
+            self.halign,
+            self.padding.tuple(),
+            self.heights.tobytes(),
+            self.widths.tobytes(),
+        )
+
     def adjust_cell_sizes(self, objects: list[Object]):
+        self.adjust_cell_sizes_from_array(object_sizes(objects))
+
+    def get_object_grid_indices(self, n: int) -> tuple[np.ndarray, np.ndarray]:
+        xs, ys = self.get_grid_indices()
+        if n > len(xs):
+            raise IndexError(f"Index {len(xs)} is out of bounds: {self.grid}")
+        return xs[:n], ys[:n]
+
+    def adjust_cell_sizes_from_array(self, sizes: np.ndarray):
+        # `sizes` holds the (width, height) of each object, NaN if not set
+        xs, ys = self.get_object_grid_indices(len(sizes))
+
         # Set same width for all columns
         available_height = self.size.height * (
             1 - self.padding.top - self.padding.bottom
@@ -171,17 +920,11 @@ class Layout:
         widths = np.zeros_like(self.widths)
         ratios = np.zeros_like(self.widths)
 
-        for i, obj in enumerate(objects):
-            grid_pos = self.get_index(i)
-            obj_size = obj.size
-            if obj_size is None:
-                ratio = np.nan
-                width = available_width / self.grid.width
-            else:
-                ratio = obj_size.width / obj_size.height
-                width = heights[grid_pos.y, grid_pos.x] * ratio
-            ratios[grid_pos.y, grid_pos.x] = ratio
-            widths[grid_pos.y, grid_pos.x] = width
+        ratio = sizes[:, 0] / sizes[:, 1]
+        ratios[ys, xs] = ratio
+        widths[ys, xs] = np.where(
+            np.isnan(ratio), available_width / self.grid.width, heights[ys, xs] * ratio
+        )
 
         if widths.max(0).sum() > available_width:
             to_adjust = widths > available_width / self.grid.width
@@ -230,47 +973,102 @@ class Layout:
 
         return Position(x, y)
 
-    def get_position(self, index: int) -> Position:
-        grid_position = self.get_index(index)
+    def get_grid_indices(self) -> tuple[np.ndarray, np.ndarray]:
+        # Grid columns and rows of every object index
+        indices = np.arange(self.grid.width * self.grid.height)
+        return indices % self.grid.width, indices // self.grid.width
+
+    def get_positions(self) -> np.ndarray:
+        # Positions of all objects as an (n, 2) array, cached until the cell sizes
+        # or the size of the layout change.
+        if self._positions is None:
+            self._positions = self.compute_positions()
+        return self._positions
+
+    def get_sizes(self) -> np.ndarray:
+        if self._sizes is None:
+            xs, ys = self.get_grid_indices()
+            self._sizes = np.stack(
+                [
+                    np.round(self.widths[ys, xs]).astype(int),
+                    np.round(self.heights[ys, xs]).astype(int),
+                ],
+                axis=1,
+            )
+        return self._sizes
+
+    def compute_positions(self) -> np.ndarray:
+        xs, ys = self.get_grid_indices()
 
-        x = self.widths[:, : grid_position.x].max(0).sum() if grid_position.x else 0
-        y = self.heights[: grid_position.y].max(1).sum() if grid_position.y else 0
+        column_widths = self.widths.max(0)
+        row_heights = self.heights.max(1)
+
+        x = np.concatenate([[0], np.cumsum(column_widths)[:-1]])[xs]
+        y = np.concatenate([[0], np.cumsum(row_heights)[:-1]])[ys]
 
         left = self.padding.left * self.size.width / self.grid.width
         right = self.padding.right * self.size.width / self.grid.width
         top = self.padding.top * self.size.height / self.grid.height
         bottom = self.padding.bottom * self.size.height / self.grid.height
 
-        x += (left + right) * grid_position.x
-        y += (top + bottom) * grid_position.y
+        x += (left + right) * xs
+        y += (top + bottom) * ys
 
         if self.halign == "left":
             x += left
         elif self.halign == "center":
-            x += (left + right + self.widths[:, grid_position.x].max()) / 2
-            x -= self.widths[grid_position.y, grid_position.x] / 2
+            x += (left + right + column_widths[xs]) / 2
+            x -= self.widths[ys, xs] / 2
         elif self.halign == "right":
-            x += left + right + self.widths[:, grid_position.x].max()
-            x -= right + self.widths[grid_position.y, grid_position.x]
+            x += left + right + column_widths[xs]
+            x -= right + self.widths[ys, xs]
 
         if self.valign == "top":
             y += top
         elif self.valign == "center":
-            y += (top + bottom + self.heights[grid_position.y].max()) / 2
-            y -= self.heights[grid_position.y, grid_position.x] / 2
+            y += (top + bottom + row_heights[ys]) / 2
+            y -= self.heights[ys, xs] / 2
         elif self.valign == "bottom":
-            y += top + bottom + self.heights[grid_position.y].max()
-            y -= bottom + self.heights[grid_position.y, grid_position.x]
+            y += top + bottom + row_heights[ys]
+            y -= bottom + self.heights[ys, xs]
+
+        return np.stack([x, y], axis=1).astype(int)
 
-        return Position(int(x), int(y))
+    def get_position(self, index: int) -> Position:
+        self.get_index(index)
+        (x, y) = self.get_positions()[index].tolist()
+        return Position(x, y)
 
     def get_size(self, index: int) -> Size:
-        position = self.get_index(index)
+        self.get_index(index)
+        (width, height) = self.get_sizes()[index].tolist()
+        return Size(width, height)
+
+
+def copy_state(state: dict, memo: dict) -> dict:
+    # Objects, layouts, lists (of objects) and arrays are copied, other attributes
+    # are immutable
+    return {
+        name: copy_value(value, memo) if isinstance(value, COPIED_TYPES) else value
+        for name, value in state.items()
+    }
 
-        return Size(
-            int(np.round(self.widths[position.y, position.x])),
-            int(np.round(self.heights[position.y, position.x])),
-        )
+
+def copy_value(value, memo: dict):
+    # Objects shared in the tree (ex: Node.gpus and Node.objects) are copied once
+    copied = memo.get(id(value))
+    if copied is not None:
+        return copied
+    if isinstance(value, list):
+        return [copy_value(item, memo) for item in value]
+    if isinstance(value, np.ndarray):
+        return value.copy()
+    if isinstance(value, (Object, Layout)):
+        return value.__deepcopy__(memo)
+    return copy.deepcopy(value, memo)
+
+
+COPIED_TYPES = (Object, Layout, list, np.ndarray)
 
 
 class FlexibleColumnsLayout(Layout):
@@ -290,21 +1088,28 @@ class FlexibleColumnsLayout(Layout):
         self.cell_widths = np.ndarray(self.grid.tuple()[::-1], dtype=object)
 
     def _fill_indices(self):
-        indices = np.ones(self.grid.tuple()[::-1], dtype=int) * -1
+        # Objects fill the cells row by row, skipping the cells below the number of
+        # rows of their column.
+        filled = np.arange(self.grid.height)[:, None] < np.asarray(self.nrows)[None, :]
+        ith_object = int(filled.sum())
+        assert ith_object == sum(self.nrows), f"{ith_object} != {sum(self.nrows)}"
 
-        print(self.nrows)
-        ith_object = 0
-        for ith_row in range(self.grid.height):
-            for ith_column in range(self.grid.width):
-                print(ith_row, ith_column, ith_object, self.nrows[ith_column])
-                if self.nrows[ith_column] > ith_row:
-                    indices[ith_row, ith_column] = ith_object
-                    ith_object += 1
+        indices = np.ones(self.grid.tuple()[::-1], dtype=int) * -1
+        indices[filled] = np.arange(ith_object)
 
-        assert ith_object == sum(self.nrows), f"{ith_object} != {sum(self.nrows)}"
+        # Inverse index, grid row and column of each object
+        self.grid_rows, self.grid_columns = np.nonzero(filled)
 
         return indices
 
+    def structure_key(self) -> Hashable:
+        return (
+            super().structure_key(),
+            tuple(self.nrows),
+            self.cell_heights.tobytes(),
+            self.cell_widths.tobytes(),
+        )
+
     @property
     def size(self):
         return Size(
@@ -318,19 +1123,17 @@ class FlexibleColumnsLayout(Layout):
             ),
         )
 
-    def adjust_cell_sizes(self, objects: list[Object]):
+    def adjust_cell_sizes_from_array(self, sizes: np.ndarray):
+        xs, ys = self.get_object_grid_indices(len(sizes))
+        if np.isnan(sizes).any():
+            raise ValueError("Size must be set for all objects")
+
         # Set same width for all columns
         heights = np.zeros_like(self.heights)
         widths = np.zeros_like(self.widths)
 
-        for i, obj in enumerate(objects):
-            grid_pos = self.get_index(i)
-            obj_size = obj.size
-            if obj_size is None:
-                raise ValueError("Size must be set for all objects")
-
-            heights[grid_pos.y, grid_pos.x] = obj_size.height
-            widths[grid_pos.y, grid_pos.x] = obj_size.width
+        heights[ys, xs] = sizes[:, 1]
+        widths[ys, xs] = sizes[:, 0]
 
         self.heights = heights
         self.widths = widths
@@ -351,33 +1154,21 @@ class FlexibleColumnsLayout(Layout):
         #       Total heigth and widths should be computed based on heights and widths + padding.
         #       It will be trickier to account for larger objects in some columns
 
-    def get_index(self, index: int) -> Position:
-        mask = index == self.indices
-        if mask.sum() < 1:
-            raise IndexError(f"Index {index} is out of bounds:\n{self.indices}")
+    def get_grid_indices(self) -> tuple[np.ndarray, np.ndarray]:
+        return self.grid_columns, self.grid_rows
 
-        y, x = np.unravel_index(mask.reshape(-1).argmax(), mask.shape)
+    def compute_positions(self) -> np.ndarray:
+        xs, ys = self.get_grid_indices()
 
-        # TODO: Verify if we should swap x and y
-        return Position(x, y)
-
-    def get_position(self, index: int) -> Position:
-        grid_position = self.get_index(index)
+        cell_widths = self.cell_widths.astype(float)
+        cell_heights = self.cell_heights.astype(float)
 
-        print(grid_position)
-        print(self.cell_heights.shape)
-        print(self.cell_widths.shape)
-
-        x = (
-            self.cell_widths[grid_position.y, : grid_position.x].sum()
-            if grid_position.x
-            else 0
-        )
-        y = (
-            self.cell_heights[: grid_position.y, grid_position.x].sum()
-            if grid_position.y
-            else 0
-        )
+        x = np.zeros_like(cell_widths)
+        x[:, 1:] = np.cumsum(cell_widths, axis=1)[:, :-1]
+        y = np.zeros_like(cell_heights)
+        y[1:] = np.cumsum(cell_heights, axis=0)[:-1]
+        x = x[ys, xs]
+        y = y[ys, xs]
 
         left = self.padding.left
         right = self.padding.right
@@ -387,22 +1178,28 @@ class FlexibleColumnsLayout(Layout):
         if self.halign == "left":
             x += left
         elif self.halign == "center":
-            x += self.cell_widths[grid_position.y, grid_position.x] / 2
-            x -= self.widths[grid_position.y, grid_position.x] / 2
+            x += cell_widths[ys, xs] / 2
+            x -= self.widths[ys, xs] / 2
         elif self.halign == "right":
-            x += self.cell_widths[grid_position.y, grid_position.x]
-            x -= right + self.widths[grid_position.y, grid_position.x]
+            x += cell_widths[ys, xs]
+            x -= right + self.widths[ys, xs]
 
         if self.valign == "top":
             y += top
         elif self.valign == "center":
-            y += self.cell_heights[grid_position.y, grid_position.x] / 2
-            y -= self.heights[grid_position.y, grid_position.x] / 2
+            y += cell_heights[ys, xs] / 2
+            y -= self.heights[ys, xs] / 2
         elif self.valign == "bottom":
-            y += self.cell_heights[grid_position.y, grid_position.x]
-            y -= bottom + self.heights[grid_position.y, grid_position.x]
+            y += cell_heights[ys, xs]
+            y -= bottom + self.heights[ys, xs]
+
+        return np.stack([x, y], axis=1).astype(int)
 
-        return Position(int(x), int(y))
+    def get_index(self, index: int) -> Position:
+        if not 0 <= index < len(self.grid_rows):
+            raise IndexError(f"Index {index} is out of bounds:\n{self.indices}")
+
+        return Position(int(self.grid_columns[index]), int(self.grid_rows[index]))
 
     # def get_position(self, index: int) -> Position:
     #     # TODO
@@ -423,21 +1220,183 @@ class ComposedObject(Object, Generic[T]):
     layout: Layout = field(default_factory=Layout)
     objects: list[T] = field(default_factory=list)
     background_color: tuple[int, int, int] = (255, 255, 255, 0)
+    # Render structurally identical children once and stamp the raster
+    instanced: bool = False
 
     def __post_init__(self):
-        self.layout.adjust_cell_sizes(self.objects)
+        self.layout.adjust_cell_sizes_from_array(self.child_sizes)
+
+    def __setattr__(self, name, value):
+        if name == "objects":
+            self.adopt(self.__dict__.get("objects", []), value)
+            self._child_sizes = object_sizes(value)
+            self._child_indices = {}
+            for i, obj in enumerate(value):
+                self._child_indices.setdefault(id(obj), []).append(i)
+        elif name == "layout":
+            if "layout" in self.__dict__:
+                self.layout.detach(self)
+            value.attach(self)
+        super().__setattr__(name, value)
+
+    def __getstate__(self):
+        state = super().__getstate__()
+        del state["_child_indices"]
+        state.pop("_canvas", None)
+        state.pop("_dirty_boxes", None)
+        return state
+
+    def __setstate__(self, state):
+        super().__setstate__(state)
+        self.adopt([], self.objects)
+        self.layout.attach(self)
+        self.__dict__["_child_indices"] = {}
+        for i, obj in enumerate(self.objects):
+            self._child_indices.setdefault(id(obj), []).append(i)
+
+    def __deepcopy__(self, memo: dict) -> "ComposedObject":
+        # Children and the layout are copied first, other attributes pointing to
+        # them (ex: Node.gpus, Cluster.nodes) are mapped to the copies through the
+        # memo and the rest is immutable
+        clone = type(self).__new__(type(self))
+        memo[id(self)] = clone
+        ref = weakref.ref(clone)
+        objects = []
+        indices: dict[int, list[int]] = {}
+        for i, obj in enumerate(self.objects):
+            child = memo.get(id(obj))
+            if child is None:
+                child = obj.__deepcopy__(memo)
+            child._parents[id(clone)] = ref
+            objects.append(child)
+            indices.setdefault(id(child), []).append(i)
+        memo[id(self.objects)] = objects
+        layout = copy_value(self.layout, memo)
+        layout.attach(clone)
+        clone.__dict__.update(
+            {
+                name: memo.get(id(value), value)
+                for name, value in self.__dict__.items()
+                if name not in RENDER_STATE_ATTRIBUTES
+            },
+            _cached_image=None,
+            _structure_key=None,
+            _token=next(instance_tokens),
+            _parents={},
+            _child_sizes=self._child_sizes.copy(),
+            _child_indices=indices,
+        )
+        return clone
 
     @property
-    def image(self) -> Image.Image:
+    def child_sizes(self) -> np.ndarray:
+        # (width, height) of the children, kept up to date as they change. In-place
+        # changes to `objects` are caught when the number of children changes.
+        if len(self._child_sizes) != len(self.objects):
+            self.objects = self.objects
+        return self._child_sizes
+
+    def invalidate(self):
+        # Changes of the object itself require a full redraw by refresh()
+        self.__dict__["_canvas"] = None
+        super().invalidate()
+
+    def child_invalidated(self, child: Object):
+        indices = self.__dict__.get("_child_indices", {}).get(id(child), ())
+        canvas = self.__dict__.get("_canvas")
+        if canvas is not None:
+            positions = self.layout.get_positions()
+            for i in indices:
+                # Both the previous and the new extent of the child must be redrawn
+                for size in (self._child_sizes[i], size_array(child.size)):
+                    if not np.isnan(size).any():
+                        (x, y) = positions[i].tolist()
+                        (width, height) = np.ceil(size).astype(int).tolist()
+                        self._dirty_boxes.add((x, y, x + width, y + height))
+        for i in indices:
+            self._child_sizes[i] = size_array(child.size)
+        # Only the children changed, keep the canvas of refresh()
+        Object.invalidate(self)
+
+    def refresh(self) -> tuple[Image.Image, list[Box]]:
+        # Incremental rendering, returns the canvas kept from the previous refresh
+        # updated in place with the regions of the children that changed since.
+        canvas = self.__dict__.get("_canvas")
+        if canvas is None:
+            canvas = new_canvas(self.layout.size)
+            self.draw(canvas, Position(), canvas.box)
+            self.__dict__["_canvas"] = canvas
+            self.__dict__["_dirty_boxes"] = set()
+            return canvas.image, [canvas.box]
+
+        boxes = []
+        for box in sorted(self._dirty_boxes):
+            box = intersect(box, canvas.box)
+            if box is not None:
+                self.draw(canvas, Position(), box)
+                boxes.append(box)
+        self._dirty_boxes.clear()
+
+        return canvas.image, boxes
+
+    def render(self) -> Image.Image:
         # TODO: Support border with name
         # TODO: Support background color
-        image = Image.new("RGBA", self.layout.size.tuple(), color=self.background_color)
-        for i, obj in enumerate(self.objects):
-            obj_position = self.layout.get_position(i)
-            # obj.size = self.layout.get_size(i)
-            image.paste(obj.image, obj_position.tuple())
+        canvas = new_canvas(self.layout.size)
+        self.draw(canvas, Position(), canvas.box)
+        return canvas.image
+
+    def draw(self, canvas: Canvas, position: Position, clip: Box):
+        # Children are drawn straight into the canvas at their absolute position,
+        # clipped to this object like when pasting its own image.
+        if self._cached_image is not None:
+            canvas.paste(self._cached_image, position, clip)
+            return
+
+        (width, height) = self.layout.size.tuple()
+        clip = intersect(
+            clip, (position.x, position.y, position.x + width, position.y + height)
+        )
+        if clip is None:
+            return
 
-        return image
+        canvas.fill(clip, self.background_color)
+        positions = self.layout.get_positions().tolist()
+        for obj, (x, y) in zip(self.objects, positions):
+            # obj.size = self.layout.get_size(i)
+            obj_position = Position(position.x + x, position.y + y)
+            obj_size = obj.size
+            if obj_size is not None and not intersect(
+                clip,
+                (
+                    obj_position.x,
+                    obj_position.y,
+                    obj_position.x + obj_size.width,
+                    obj_position.y + obj_size.height,
+                ),
+            ):
+                continue
+
+            if self.instanced:
+                body = instance_cache.get(
+                    obj.structure_key,
+                    lambda obj=obj: observe_render(obj, obj.render_body),
+                )
+                canvas.paste(body, obj_position, clip)
+                obj.draw_overlay(canvas, obj_position, clip)
+            else:
+                if render_observer is None:
+                    obj.draw(canvas, obj_position, clip)
+                else:
+                    observe_draw(obj, canvas, obj_position, clip)
+
+    def compute_structure_key(self) -> Hashable:
+        return (
+            type(self),
+            self.layout.structure_key(),
+            self.background_color,
+            tuple((obj.structure_key, obj.overlay_key) for obj in self.objects),
+        )
 
     @property
     def size(self) -> Size:
@@ -447,7 +1406,7 @@ class ComposedObject(Object, Generic[T]):
     def size(self, size: Size):
         self.layout.size = size
         # TODO: Test nested ComposedObject
-        self.layout.adjust_cell_sizes(self.objects)
+        self.layout.adjust_cell_sizes_from_array(self.child_sizes)
 
 
 @dataclass(kw_only=True)
@@ -463,6 +1422,12 @@ class BoundingBox(Object):
 
     # Will it work if size is set during construction?
 
+    def __setattr__(self, name, value):
+        if name == "object":
+            old = self.__dict__.get("object")
+            self.adopt([] if old is None else [old], [value])
+        super().__setattr__(name, value)
+
     @property
     def size(self) -> Size:
         if self.object.size is None:
@@ -473,43 +1438,126 @@ class BoundingBox(Object):
             self.object.size.height + self.padding.top + self.padding.bottom,
         )
 
+    def __setstate__(self, state):
+        super().__setstate__(state)
+        self.adopt([], [self.object])
+
+    def compute_structure_key(self) -> Hashable:
+        return (
+            type(self),
+            self.size.tuple(),
+            self.radius,
+            self.fill,
+            self.outline,
+            self.width,
+            self.padding.tuple(),
+            self.background_color,
+            self.object.structure_key,
+            self.object.overlay_key,
+        )
+
     @property
-    def image(self):
-        background = Image.new("RGBA", self.size.tuple(), color=self.background_color)
+    def overlay_key(self) -> Hashable:
+        return self.name
+
+    def render(self) -> Image.Image:
+        canvas = canvas_type.from_image(self.render_body())
+        self.draw_overlay(canvas, Position(), canvas.box)
+        return canvas.image
+
+    def render_body(self) -> Image.Image:
+        canvas = canvas_type.from_image(self.render_box((0, 0, *self.size.tuple())))
+        canvas.composite(
+            self.object.image,
+            Position(int(self.padding.left), int(self.padding.top)),
+            canvas.box,
+        )
+        return canvas.image
+
+    def render_box(self, box: Box) -> Image.Image:
+        # Background and rounded rectangle of the part of the box in `box`, relative
+        # to the top left corner of the box
+        (x0, y0, x1, y1) = box
+        background = Image.new("RGBA", (x1 - x0, y1 - y0), color=self.background_color)
         draw = ImageDraw.Draw(background)
         draw.rounded_rectangle(
-            ((0, 0), self.size.tuple()),
+            ((-x0, -y0), (self.size.width - x0, self.size.height - y0)),
             radius=int(self.radius * (self.size.width + self.size.height) / 2),
             fill=self.fill,
             outline=self.outline,
             width=self.width,
             corners=None,
         )
-        image = Image.new("RGBA", self.size.tuple(), color=(255, 255, 255, 0))
-        image.paste(
-            self.object.image,
-            (
-                int(self.padding.left),
-                int(self.padding.top),
-            ),
+        return background
+
+    def draw(self, canvas: Canvas, position: Position, clip: Box):
+        # Only the visible part is rendered and the object is drawn in place rather
+        # than through its memoized image, tiled renders stay bounded in memory
+        if self._cached_image is not None:
+            canvas.paste(self._cached_image, position, clip)
+            return
+
+        (width, height) = self.size.tuple()
+        box = intersect(
+            clip, (position.x, position.y, position.x + width, position.y + height)
         )
+        if box is None:
+            return
+        origin = Position(box[0], box[1])
+        region = canvas_type.from_image(
+            self.render_box(
+                (
+                    box[0] - position.x,
+                    box[1] - position.y,
+                    box[2] - position.x,
+                    box[3] - position.y,
+                )
+            )
+        )
+        region.origin = origin
 
-        image = Image.alpha_composite(
-            background,
-            image,
+        # Drawn apart and blended like the object image in render_body()
+        layer = new_canvas(Size(box[2] - box[0], box[3] - box[1]), origin=origin)
+        object_position = Position(
+            position.x + int(self.padding.left), position.y + int(self.padding.top)
         )
+        if render_observer is None:
+            self.object.draw(layer, object_position, layer.box)
+        else:
+            observe_draw(self.object, layer, object_position, layer.box)
+        region.composite(layer.image, origin, region.box)
+        self.draw_overlay(region, position, region.box)
+        canvas.paste(region.image, origin, clip)
+
+    def draw_overlay(self, canvas: Canvas, position: Position, clip: Box):
+        # Draw on a crop of the visible part so that the label is clipped to the box
+        # like in render()
+        box = intersect(
+            clip,
+            (
+                *position.tuple(),
+                position.x + self.size.width,
+                position.y + self.size.height,
+            ),
+        )
+        if box is None:
+            return
+        region = canvas.crop(box)
 
-        draw = ImageDraw.Draw(image)
+        draw = ImageDraw.Draw(region)
 
         draw.text(
-            (self.size.width / 2, self.padding.top),
+            (
+                position.x + self.size.width / 2 - box[0],
+                position.y + self.padding.top - box[1],
+            ),
             self.name,
             fill=(0, 0, 0, 255),
             align="center",
             anchor="mt",
         )
 
-        return image
+        canvas.paste(region, Position(box[0], box[1]), clip)
 
 
 @dataclass(kw_only=True)
@@ -519,33 +1567,42 @@ class Node(ComposedObject):
     ram: ComposedObject[RAM]
 
     objects: list[ComposedObject] = field(init=False)
+    # Drawn as a flat color up to this size, components are unreadable anyway
+    glyph_size: int = 16
+    glyph_color: tuple[int, int, int, int] = (200, 200, 200, 255)
 
     def __post_init__(self):
         self.objects = [self.gpus, self.cpus, self.ram]
         super().__post_init__()
 
     @property
-    def image(self):
-        image = super().image
-        self.size
-        background = Image.new("RGBA", self.size.tuple(), color=self.background_color)
-        draw = ImageDraw.Draw(background)
-        draw.rounded_rectangle(
-            ((0, 0), self.size.tuple()),
-            radius=90,
-            fill=(200, 200, 200),
-            outline=None,
-            width=5,
-            corners=None,
+    def is_glyph(self) -> bool:
+        return max(self.size.tuple()) <= self.glyph_size
+
+    def draw(self, canvas: Canvas, position: Position, clip: Box):
+        if not self.is_glyph:
+            super().draw(canvas, position, clip)
+            return
+        (width, height) = self.size.tuple()
+        box = intersect(
+            clip, (position.x, position.y, position.x + width, position.y + height)
         )
+        if box is not None:
+            canvas.fill(box, self.glyph_color)
 
-        background.paste(image, (0, 0))
-        return background
+    def compute_structure_key(self) -> Hashable:
+        return (super().compute_structure_key(), self.glyph_size, self.glyph_color)
+
+    def render(self) -> Image.Image:
+        if self.is_glyph:
+            return Image.new("RGBA", self.size.tuple(), color=self.glyph_color)
+        return super().render()
 
 
 @dataclass(kw_only=True)
 class Cluster(ComposedObject):
     nodes: list[Node]
+    instanced: bool = True
 
     objects: list[Node] = field(init=False)
 
@@ -0,0 +1,175 @@
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Iterator
+
+import simple_parsing
+from simple_parsing import ArgumentParser
+from tqdm import tqdm
+
+from cluster_map.architecture import Size, asset_cache, instance_cache
+from cluster_map.nodes import build_cluster
+from cluster_map.pyramid import save_pyramid
+from cluster_map.render import save_mapped, save_tiled
+from cluster_map.spec import cached_scene, load_spec
+
+
+@dataclass
+class RenderArgs:
+    # Cluster spec files (TOML or JSON)
+    specs: list[str] = simple_parsing.field(positional=True, nargs="+")
+    # Sizes of the maps as WIDTHxHEIGHT, or a single number for square maps. Each
+    # spec is rendered at every size, at the size of the spec if not set.
+    sizes: list[str] = field(default_factory=list)
+    # Folder of the rendered maps, named <cluster>-<width>x<height>.png
+    output_dir: str = "."
+    # Write Deep Zoom tile pyramids (<cluster>-<width>x<height>.dzi) instead
+    pyramid: bool = False
+    # Folder of the scenes compiled for the pyramids, reused while the spec does
+    # not change. ~/.cache/cluster_map by default.
+    cache_dir: str | None = None
+    # Worker processes, each one keeps its caches for all the maps it renders.
+    # Pyramids are rendered one after the other with their tiles split instead.
+    jobs: int = 1
+    # zlib compression level of the PNG files
+    compress_level: int = 6
+    # Draw PNG maps into a memory-mapped scratch file in this folder, for maps
+    # larger than the memory. Rows of tiles are drawn one at a time if not set.
+    scratch_dir: str | None = None
+    # Path of the JSON timing summary, stdout if not set
+    timings: str | None = None
+
+
+@dataclass(frozen=True)
+class Variant:
+    spec: str
+    size: Size | None = None
+
+
+def parse_size(value: str) -> Size:
+    # ex: 4000x3000, or 4000 for 4000x4000
+    (width, separator, height) = value.lower().partition("x")
+    try:
+        return Size(int(width), int(height if separator else width))
+    except ValueError:
+        raise ValueError(f"Invalid size {value!r}, expected WIDTHxHEIGHT") from None
+
+
+def iter_variants(args: RenderArgs) -> Iterator[Variant]:
+    sizes = [parse_size(size) for size in args.sizes] or [None]
+    for spec in args.specs:
+        for size in sizes:
+            yield Variant(spec, size)
+
+
+def cache_stats() -> dict:
+    return {
+        "assets": {"hits": asset_cache.hits, "misses": asset_cache.misses},
+        "instances": {"hits": instance_cache.hits, "misses": instance_cache.misses},
+    }
+
+
+def render_variant(variant: Variant, args: RenderArgs) -> dict:
+    # Caches are module globals, they are shared by all the variants rendered in
+    # the same process.
+    stats = cache_stats()
+
+    start = time.perf_counter()
+    fleet = load_spec(variant.spec)
+    if variant.size is not None:
+        fleet.size = variant.size
+    if args.pyramid:
+        # Pyramids are drawn from the compiled scene, unchanged specs load it
+        scene = cached_scene(fleet, args.cache_dir)
+    else:
+        cluster = build_cluster(fleet)
+    build_time = time.perf_counter() - start
+
+    (width, height) = fleet.size.tuple()
+    name = f"{fleet.name}-{width}x{height}"
+    start = time.perf_counter()
+    if args.pyramid:
+        path = os.path.join(args.output_dir, f"{name}.dzi")
+        save_pyramid(scene, path, compress_level=args.compress_level, jobs=args.jobs)
+    elif args.scratch_dir is not None:
+        path = os.path.join(args.output_dir, f"{name}.png")
+        save_mapped(
+            cluster,
+            path,
+            compress_level=args.compress_level,
+            scratch_dir=args.scratch_dir,
+        )
+    else:
+        path = os.path.join(args.output_dir, f"{name}.png")
+        save_tiled(cluster, path, compress_level=args.compress_level)
+    render_time = time.perf_counter() - start
+
+    return {
+        "spec": variant.spec,
+        "cluster": fleet.name,
+        "nodes": fleet.n_nodes,
+        "size": [width, height],
+        "output": path,
+        "pid": os.getpid(),
+        "build": build_time,
+        "render": render_time,
+        "cache": {
+            cache: {
+                name: value - stats[cache][name] for name, value in counters.items()
+            }
+            for cache, counters in cache_stats().items()
+        },
+    }
+
+
+def render(args: RenderArgs) -> dict:
+    variants = list(iter_variants(args))
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    start = time.perf_counter()
+    with tqdm(total=len(variants), unit="map") as progress:
+        if args.jobs == 1 or args.pyramid:
+            results = []
+            for variant in variants:
+                results.append(render_variant(variant, args))
+                progress.update()
+        else:
+            # Workers live for the whole batch, process startup and asset decoding
+            # are paid once per worker rather than once per map.
+            with ProcessPoolExecutor(args.jobs) as executor:
+                futures = [
+                    executor.submit(render_variant, variant, args)
+                    for variant in variants
+                ]
+                for future in futures:
+                    future.add_done_callback(lambda _: progress.update())
+                results = [future.result() for future in futures]
+
+    return {
+        "jobs": args.jobs,
+        "total": time.perf_counter() - start,
+        "renders": results,
+    }
+
+
+def main(argv: list[str] | None = None):
+    parser = ArgumentParser(prog="cluster-map", description="Render cluster maps")
+    commands = parser.add_subparsers(dest="command", required=True)
+    render_parser = commands.add_parser("render", help="Render cluster specs")
+    render_parser.add_arguments(RenderArgs, dest="render")
+    options = parser.parse_args(argv)
+
+    summary = render(options.render)
+
+    if options.render.timings is None:
+        json.dump(summary, sys.stdout, indent=2)
+    else:
+        with open(options.render.timings, "w", encoding="utf-8") as file:
+            json.dump(summary, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
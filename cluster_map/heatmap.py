@@ -0,0 +1,169 @@
+from typing import Iterator
+
+import numpy as np
+from PIL import Image
+
+from cluster_map.architecture import (
+    BoundingBox,
+    Box,
+    ComposedObject,
+    ImageObject,
+    Object,
+    Position,
+    Rectangle,
+    intersect,
+)
+from cluster_map.scene import compile_scene
+
+# RGBA colors evenly spread between the lowest and the highest value
+UTILIZATION = np.array(
+    [
+        (49, 54, 149, 255),
+        (116, 173, 209, 255),
+        (254, 224, 144, 255),
+        (244, 109, 67, 255),
+        (165, 0, 38, 255),
+    ],
+    dtype=np.uint8,
+)
+
+
+def apply_colormap(
+    values: np.ndarray,
+    colormap: np.ndarray = UTILIZATION,
+    vmin: float = 0,
+    vmax: float = 1,
+) -> np.ndarray:
+    # (n, 4) uint8 colors, missing values (NaN) are transparent
+    values = np.asarray(values, dtype=float)
+    positions = np.clip((values - vmin) / (vmax - vmin), 0, 1)
+    stops = np.linspace(0, 1, len(colormap))
+    colors = np.stack(
+        [np.interp(positions, stops, colormap[:, channel]) for channel in range(4)],
+        axis=-1,
+    )
+    colors[np.isnan(values)] = 0
+    return np.round(colors).astype(np.uint8)
+
+
+def iter_components(
+    obj: Object, position: Position, clip: Box | None
+) -> Iterator[Box | None]:
+    # Clipped boxes of the components (images and rectangles) in tree order, None
+    # for hidden ones so that metrics stay aligned.
+    if isinstance(obj, ComposedObject):
+        (width, height) = obj.layout.size.tuple()
+        if clip is not None:
+            clip = intersect(
+                clip, (position.x, position.y, position.x + width, position.y + height)
+            )
+        positions = obj.layout.get_positions()[: len(obj.objects)]
+        positions = (positions + position.tuple()).tolist()
+        for child, (x, y) in zip(obj.objects, positions):
+            yield from iter_components(child, Position(x, y), clip)
+    elif isinstance(obj, BoundingBox):
+        (width, height) = obj.size.tuple()
+        if clip is not None:
+            clip = intersect(
+                clip, (position.x, position.y, position.x + width, position.y + height)
+            )
+        inner = Position(
+            position.x + int(obj.padding.left), position.y + int(obj.padding.top)
+        )
+        yield from iter_components(obj.object, inner, clip)
+    elif isinstance(obj, (ImageObject, Rectangle)):
+        (width, height) = obj.size.tuple()
+        box = (position.x, position.y, position.x + width, position.y + height)
+        yield None if clip is None else intersect(clip, box)
+
+
+def component_boxes(obj: Object, scale: float = 1) -> np.ndarray:
+    # (n, 4) boxes at the given scale, empty for hidden components
+    (width, height) = obj.size.tuple()
+    boxes = [
+        (0, 0, 0, 0) if box is None else box
+        for box in iter_components(obj, Position(), (0, 0, width, height))
+    ]
+    boxes = np.array(boxes, dtype=float).reshape(-1, 4)
+    return np.round(boxes * scale).astype(np.int32)
+
+
+def object_mask(size: tuple[int, int], boxes: np.ndarray) -> np.ndarray:
+    # Index of the component covering each pixel, -1 for none. Later components
+    # are drawn over earlier ones.
+    (width, height) = size
+    mask = np.full((height, width), -1, dtype=np.int32)
+    for i, (x0, y0, x1, y1) in enumerate(boxes.tolist()):
+        mask[y0:y1, x0:x1] = i
+    return mask
+
+
+class Heatmap:
+    # Tints every component of `obj` by its metric value. The base image and the
+    # mask are computed once, new metrics only blend the masked pixels again.
+    def __init__(
+        self,
+        obj: Object,
+        scale: float = 1,
+        alpha: float = 0.5,
+        colormap: np.ndarray = UTILIZATION,
+        vmin: float = 0,
+        vmax: float = 1,
+    ):
+        self.alpha = alpha
+        self.colormap = colormap
+        self.vmin = vmin
+        self.vmax = vmax
+
+        base = compile_scene(obj).render(scale=scale)
+        self.base = np.asarray(base.convert("RGBA"))
+        self.boxes = component_boxes(obj, scale)
+        mask = object_mask(base.size, self.boxes).ravel()
+        # Only opaque pixels are tinted, the others are the background or edges
+        # of the components. Masked pixels are grouped by component, those of
+        # component i are pixels[offsets[i]:offsets[i + 1]].
+        self.pixels = np.flatnonzero((mask >= 0) & (self.base[..., 3].ravel() == 255))
+        self.pixels = self.pixels[np.argsort(mask[self.pixels], kind="stable")]
+        self.components = mask[self.pixels]
+        self.offsets = np.searchsorted(self.components, np.arange(len(self) + 1))
+
+    def __len__(self) -> int:
+        return len(self.boxes)
+
+    def render(self, values: np.ndarray) -> Image.Image:
+        output = self.base.copy()
+        self.blend(output, values)
+        return Image.fromarray(output)
+
+    def blend(
+        self,
+        output: np.ndarray,
+        values: np.ndarray,
+        components: np.ndarray | None = None,
+    ):
+        # Tints the pixels of `components` (all of them if None) of a copy of the
+        # base image in place, other pixels are left as is.
+        if len(values) != len(self):
+            raise ValueError(f"Expected {len(self)} values, got {len(values)}")
+
+        (pixels, owners) = (self.pixels, self.components)
+        if components is not None:
+            # Concatenated ranges of the pixels of each component
+            starts = self.offsets[components]
+            counts = self.offsets[components + 1] - starts
+            order = np.arange(counts.sum()) + np.repeat(
+                starts - np.cumsum(counts) + counts, counts
+            )
+            (pixels, owners) = (pixels[order], owners[order])
+
+        colors = apply_colormap(values, self.colormap, self.vmin, self.vmax)
+        # Blending in 16-bit integers keeps the temporary arrays small
+        weights = np.round(colors[:, 3].astype(np.uint16) * self.alpha).astype(
+            np.uint16
+        )[owners, None]
+        tints = colors[owners, :3].astype(np.uint16)
+
+        base = self.base.reshape(-1, 4)[pixels, :3].astype(np.uint16)
+        output.reshape(-1, 4)[pixels, :3] = (
+            (base * (255 - weights) + tints * weights + 127) // 255
+        ).astype(np.uint8)
@@ -0,0 +1,113 @@
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterator
+
+from PIL import Image
+
+from cluster_map import architecture
+from cluster_map.architecture import Box, Object, Position, image_nbytes, intersect
+
+
+@dataclass
+class RenderStats:
+    calls: int = 0
+    # Time spent in the object itself, excluding nested renders and draws
+    time: float = 0.0
+    total_time: float = 0.0
+    pixels: int = 0
+    nbytes: int = 0
+
+
+class RenderProfile:
+    # Aggregates the renders and draws reported by the objects, per class and name
+    def __init__(self):
+        self.by_class: dict[str, RenderStats] = defaultdict(RenderStats)
+        self.by_name: dict[str, RenderStats] = defaultdict(RenderStats)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    @property
+    def _stack(self) -> list:
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def start(
+        self,
+        obj: Object,
+        operation: str,
+        position: Position | None = None,
+        clip: Box | None = None,
+    ):
+        self._stack.append([obj, operation, position, clip, time.perf_counter(), 0.0])
+
+    def stop(self, image: Image.Image | None = None):
+        end = time.perf_counter()
+        (obj, operation, position, clip, start, nested) = self._stack.pop()
+        elapsed = end - start
+        if self._stack:
+            self._stack[-1][5] += elapsed
+
+        if image is not None:
+            pixels = image.width * image.height
+            nbytes = image_nbytes(image)
+        else:
+            pixels = self._drawn_pixels(obj, position, clip)
+            nbytes = 0
+
+        with self._lock:
+            for stats in (
+                self.by_class[f"{type(obj).__name__}.{operation}"],
+                self.by_name[obj.name],
+            ):
+                stats.calls += 1
+                stats.time += elapsed - nested
+                stats.total_time += elapsed
+                stats.pixels += pixels
+                stats.nbytes += nbytes
+
+    @staticmethod
+    def _drawn_pixels(obj: Object, position: Position, clip: Box) -> int:
+        size = obj.size
+        if size is None:
+            return 0
+        box = intersect(
+            clip,
+            (position.x, position.y, position.x + size.width, position.y + size.height),
+        )
+        if box is None:
+            return 0
+        return int((box[2] - box[0]) * (box[3] - box[1]))
+
+    def top(self, n: int = 10, by: str = "class") -> list[tuple[str, RenderStats]]:
+        stats = self.by_class if by == "class" else self.by_name
+        return sorted(stats.items(), key=lambda item: item[1].time, reverse=True)[:n]
+
+    def report(self, n: int = 10) -> str:
+        lines = []
+        for by in ["class", "name"]:
+            lines.append(
+                f"{by:<32} {'calls':>8} {'self (s)':>10} {'total (s)':>10} "
+                f"{'pixels':>12} {'bytes':>12}"
+            )
+            for key, stats in self.top(n, by):
+                lines.append(
+                    f"{key[:32]:<32} {stats.calls:>8} {stats.time:>10.4f} "
+                    f"{stats.total_time:>10.4f} {stats.pixels:>12} {stats.nbytes:>12}"
+                )
+            lines.append("")
+        return "\n".join(lines)
+
+
+@contextmanager
+def profile_rendering() -> Iterator[RenderProfile]:
+    previous = architecture.render_observer
+    profile = RenderProfile()
+    architecture.render_observer = profile
+    try:
+        yield profile
+    finally:
+        architecture.render_observer = previous
@@ -0,0 +1,146 @@
+import gc
+import itertools
+import math
+import os
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator
+
+from cluster_map.architecture import (
+    CPU,
+    GPU,
+    IMAGE_FOLDER,
+    RAM,
+    Cluster,
+    ComposedObject,
+    Layout,
+    Node,
+    Padding,
+    Size,
+)
+
+padding = Padding(0.05, 0.05, 0.05, 0.05)
+
+
+@dataclass
+class NodeShape:
+    count: int
+    gpu: str = "v100.jpg"
+    gpus: int = 4
+    cpus: int = 2
+    dimms: int = 6
+    dimm_columns: int = 1
+    cpu: str = "cpu.png"
+    ram: str = "ram.jpg"
+    # Height of the RAM column, the other columns are 1000 high
+    ram_height: int = 1000
+
+
+@dataclass
+class FleetShape:
+    name: str
+    nodes: list[NodeShape]
+    grid: Size | None = None
+    size: Size = field(default_factory=lambda: Size(10000, 10000))
+
+    @property
+    def n_nodes(self) -> int:
+        return sum(shape.count for shape in self.nodes)
+
+    @property
+    def n_components(self) -> int:
+        return sum(
+            shape.count * (shape.gpus + shape.cpus + shape.dimms)
+            for shape in self.nodes
+        )
+
+
+def build_node(shape: NodeShape, name: str) -> Node:
+    # CPU-only nodes keep an empty GPU column
+    gpus = ComposedObject(
+        name=f"{name}-gpus",
+        layout=Layout(Size(1, max(shape.gpus, 1)), Size(400, 1000), padding=padding),
+        objects=[
+            GPU(name=f"gpu{i}", image_path=os.path.join(IMAGE_FOLDER, shape.gpu))
+            for i in range(shape.gpus)
+        ],
+    )
+    cpus = ComposedObject(
+        name=f"{name}-cpus",
+        layout=Layout(Size(1, shape.cpus), Size(600, 1000), padding=padding),
+        objects=[
+            CPU(name=f"cpu{i}", image_path=os.path.join(IMAGE_FOLDER, shape.cpu))
+            for i in range(shape.cpus)
+        ],
+    )
+    dimm_rows = math.ceil(shape.dimms / shape.dimm_columns)
+    ram = ComposedObject(
+        name=f"{name}-rams",
+        layout=Layout(
+            Size(shape.dimm_columns, dimm_rows),
+            Size(100 + 200 * (shape.dimm_columns - 1), shape.ram_height),
+        ),
+        objects=[
+            RAM(name=f"ram{i}", image_path=os.path.join(IMAGE_FOLDER, shape.ram))
+            for i in range(shape.dimms)
+        ],
+    )
+
+    return Node(
+        name=name,
+        layout=Layout(Size(3, 1), Size(1200, 1000)),
+        gpus=gpus,
+        cpus=cpus,
+        ram=ram,
+    )
+
+
+def copy_node(template: Node, name: str) -> Node:
+    # Nodes of the same shape are copies of a template, their layout is only solved
+    # once. The tree is copied directly, without the dispatch of copy.deepcopy.
+    node = template.__deepcopy__({})
+    node.name = name
+    return node
+
+
+@contextmanager
+def paused_gc():
+    # Building nodes allocates hundreds of thousands of containers, the collector
+    # would otherwise rescan every node built so far many times
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def assemble_cluster(
+    name: str,
+    nodes: Iterable[Node],
+    grid: Size | None = None,
+    size: Size = Size(10000, 10000),
+) -> Cluster:
+    # Nodes are built with the collector paused, the grid is about square by default
+    with paused_gc():
+        nodes = list(nodes)
+        if grid is None:
+            width = math.ceil(math.sqrt(len(nodes)))
+            grid = Size(width, math.ceil(len(nodes) / width))
+        return Cluster(name=name, layout=Layout(grid=grid, size=size), nodes=nodes)
+
+
+def iter_nodes(fleet: FleetShape) -> Iterator[Node]:
+    counter = itertools.count()
+    for shape in fleet.nodes:
+        if shape.count == 0:
+            continue
+        template = build_node(shape, f"{fleet.name}{next(counter)}")
+        yield template
+        for _ in range(shape.count - 1):
+            yield copy_node(template, f"{fleet.name}{next(counter)}")
+
+
+def build_cluster(fleet: FleetShape) -> Cluster:
+    return assemble_cluster(fleet.name, iter_nodes(fleet), fleet.grid, fleet.size)
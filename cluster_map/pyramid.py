@@ -0,0 +1,113 @@
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from os import PathLike
+
+from cluster_map.architecture import Object, Size
+from cluster_map.scene import Scene, compile_scene
+
+TILE_SIZE = 256
+
+DZI_TEMPLATE = """<?xml version="1.0" encoding="UTF-8"?>
+<Image xmlns="http://schemas.microsoft.com/deepzoom/2008" TileSize="{tile_size}" Overlap="0" Format="{format}">
+  <Size Width="{width}" Height="{height}"/>
+</Image>
+"""
+
+
+def level_count(size: Size) -> int:
+    # Levels go from a single pixel (0) to the full size, halving at each step
+    return math.ceil(math.log2(max(size.width, size.height, 1))) + 1
+
+
+def level_size(size: Size, level: int, levels: int) -> Size:
+    factor = 2 ** (levels - 1 - level)
+    return Size(math.ceil(size.width / factor), math.ceil(size.height / factor))
+
+
+def render_band(
+    scene: Scene,
+    level: int,
+    row: int,
+    folder: str,
+    tile_size: int,
+    format: str,
+    compress_level: int,
+) -> int:
+    # Each level is drawn at its own scale, so small levels pick coarser levels of
+    # detail instead of being downsampled from the full image.
+    levels = level_count(scene.size)
+    size = level_size(scene.size, level, levels)
+    y = row * tile_size
+    height = min(tile_size, size.height - y)
+    band = scene.render((0, y, size.width, y + height), 0.5 ** (levels - 1 - level))
+    if format == "jpg":
+        band = band.convert("RGB")
+
+    level_folder = os.path.join(folder, str(level))
+    os.makedirs(level_folder, exist_ok=True)
+    for column, x in enumerate(range(0, size.width, tile_size)):
+        tile = band.crop((x, 0, min(x + tile_size, size.width), height))
+        tile.save(
+            os.path.join(level_folder, f"{column}_{row}.{format}"),
+            compress_level=compress_level,
+        )
+    return math.ceil(size.width / tile_size)
+
+
+_worker_scene: Scene | None = None
+
+
+def _set_worker_scene(scene: Scene):
+    global _worker_scene
+    _worker_scene = scene
+
+
+def _render_worker_band(task: tuple) -> int:
+    assert _worker_scene is not None
+    return render_band(_worker_scene, *task)
+
+
+def save_pyramid(
+    obj: Object | Scene,
+    path: str | PathLike,
+    tile_size: int = TILE_SIZE,
+    format: str = "png",
+    compress_level: int = 6,
+    jobs: int | None = 1,
+) -> int:
+    # Deep Zoom image: the <name>.dzi descriptor and tiles in
+    # <name>_files/<level>/<column>_<row>.<format>. Returns the number of tiles.
+    scene = obj if isinstance(obj, Scene) else compile_scene(obj)
+    path = os.fspath(path)
+    folder = f"{os.path.splitext(path)[0]}_files"
+
+    levels = level_count(scene.size)
+    # Rows of tiles of all levels are the tasks, largest levels first
+    tasks = [
+        (level, row, folder, tile_size, format, compress_level)
+        for level in reversed(range(levels))
+        for row in range(
+            math.ceil(level_size(scene.size, level, levels).height / tile_size)
+        )
+    ]
+
+    if jobs == 1:
+        tiles = sum(render_band(scene, *task) for task in tasks)
+    else:
+        # The scene is sent once to each worker rather than with every task
+        with ProcessPoolExecutor(
+            jobs, initializer=_set_worker_scene, initargs=(scene,)
+        ) as executor:
+            tiles = sum(executor.map(_render_worker_band, tasks))
+
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(
+            DZI_TEMPLATE.format(
+                tile_size=tile_size,
+                format=format,
+                width=scene.size.width,
+                height=scene.size.height,
+            )
+        )
+    return tiles
@@ -0,0 +1,309 @@
+import os
+import struct
+import tempfile
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from os import PathLike
+from typing import BinaryIO, Iterator
+
+import numpy as np
+from PIL import Image
+
+from cluster_map.architecture import (
+    ArrayCanvas,
+    Box,
+    Canvas,
+    ComposedObject,
+    Object,
+    Position,
+    Size,
+    channels,
+    instance_cache,
+    intersect,
+    new_canvas,
+    observe_render,
+    pack_pixel,
+)
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def iter_tiles(size: Size, tile_size: Size) -> Iterator[Box]:
+    for y in range(0, size.height, tile_size.height):
+        for x in range(0, size.width, tile_size.width):
+            yield (
+                x,
+                y,
+                min(x + tile_size.width, size.width),
+                min(y + tile_size.height, size.height),
+            )
+
+
+def render_region(obj: Object, box: Box) -> Image.Image:
+    # Only the objects intersecting the box are drawn
+    canvas = new_canvas(
+        Size(box[2] - box[0], box[3] - box[1]), origin=Position(box[0], box[1])
+    )
+    obj.draw(canvas, Position(), box)
+    return canvas.image
+
+
+def render_tiles(obj: Object, tile_size: Size) -> Iterator[tuple[Box, Image.Image]]:
+    for box in iter_tiles(obj.size, tile_size):
+        yield box, render_region(obj, box)
+
+
+def scanlines(rows: np.ndarray) -> bytes:
+    # PNG image data of (height, width, 4) uint8 RGBA rows before compression,
+    # each scanline starts with its filter type, 0 (None).
+    height = rows.shape[0]
+    filtered = np.zeros((height, rows.shape[1] * 4 + 1), dtype=np.uint8)
+    filtered[:, 1:] = rows.reshape(height, -1)
+    return filtered.tobytes()
+
+
+class PNGWriter:
+    # Streaming RGBA PNG encoder, rows are compressed and written as they come.
+    def __init__(self, file: BinaryIO, size: Size, compress_level: int = 6):
+        self.file = file
+        self.size = size
+        self.rows = 0
+        self._compressor = zlib.compressobj(compress_level)
+
+        self.file.write(PNG_SIGNATURE)
+        self.write_chunk(
+            b"IHDR", struct.pack(">IIBBBBB", size.width, size.height, 8, 6, 0, 0, 0)
+        )
+
+    def write_chunk(self, chunk_type: bytes, data: bytes):
+        self.file.write(struct.pack(">I", len(data)))
+        self.file.write(chunk_type)
+        self.file.write(data)
+        self.file.write(struct.pack(">I", zlib.crc32(data, zlib.crc32(chunk_type))))
+
+    def write_rows(self, image: Image.Image):
+        if image.width != self.size.width:
+            raise ValueError(
+                f"Rows must span the image width ({self.size.width}), got {image.width}"
+            )
+        if self.rows + image.height > self.size.height:
+            raise ValueError(f"Too many rows for image height {self.size.height}")
+
+        self.write_array(np.asarray(image.convert("RGBA")))
+
+    def write_array(self, rows: np.ndarray):
+        # (height, width, 4) uint8 RGBA rows, ex: a band of an ArrayCanvas
+        (height, width) = rows.shape[:2]
+        if width != self.size.width:
+            raise ValueError(
+                f"Rows must span the image width ({self.size.width}), got {width}"
+            )
+        if self.rows + height > self.size.height:
+            raise ValueError(f"Too many rows for image height {self.size.height}")
+
+        data = self._compressor.compress(scanlines(rows))
+        if data:
+            self.write_chunk(b"IDAT", data)
+        self.rows += height
+
+    def close(self):
+        if self.rows != self.size.height:
+            raise ValueError(f"Only {self.rows} of {self.size.height} rows written")
+        self.write_chunk(b"IDAT", self._compressor.flush())
+        self.write_chunk(b"IEND", b"")
+
+
+def save_tiled(
+    obj: Object,
+    path: str | PathLike,
+    tile_size: Size = Size(1024, 1024),
+    compress_level: int = 6,
+):
+    # PNG scanlines span the whole width, so one row of tiles is held at a time.
+    # Peak memory is bounded by width * tile height.
+    size = obj.size
+    with open(path, "wb") as file:
+        writer = PNGWriter(file, size, compress_level)
+        for y in range(0, size.height, tile_size.height):
+            height = min(tile_size.height, size.height - y)
+            band = Image.new("RGBA", (size.width, height))
+            for x in range(0, size.width, tile_size.width):
+                box = (x, y, min(x + tile_size.width, size.width), y + height)
+                band.paste(render_region(obj, box), (x, 0))
+            writer.write_rows(band)
+            del band
+        writer.close()
+
+
+class MappedCanvas(ArrayCanvas):
+    # ArrayCanvas whose pixels live in an anonymous scratch file mapped in memory.
+    # The OS pages them in and out, so maps can be larger than the RAM as long as
+    # they are drawn region by region. The file is deleted once closed.
+    def __init__(
+        self,
+        size: Size,
+        color: tuple[int, ...] = (0, 0, 0, 0),
+        origin: Position | None = None,
+        folder: str | PathLike | None = None,
+    ):
+        self.file = tempfile.TemporaryFile(dir=folder)
+        self.pixels = np.memmap(
+            self.file, dtype=np.uint32, mode="w+", shape=(size.height, size.width)
+        )
+        # The file starts zeroed (transparent), other colors are filled in bands
+        # to keep the resident memory bounded.
+        pixel = pack_pixel(color)
+        if pixel != 0:
+            rows = band_height(size.width)
+            for y in range(0, size.height, rows):
+                self.pixels[y : y + rows] = pixel
+        self.origin = Position() if origin is None else origin
+        self._image = None
+
+    def close(self):
+        self._image = None
+        del self.pixels
+        self.file.close()
+
+    def __enter__(self) -> "MappedCanvas":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def iter_bands(self, height: int | None = None) -> Iterator[np.ndarray]:
+        # (height, width, 4) views of consecutive rows, for streaming encoders
+        (total, width) = self.pixels.shape
+        height = height or band_height(width)
+        for y in range(0, total, height):
+            yield channels(self.pixels[y : y + height])
+
+
+def band_height(width: int, nbytes: int = 64 * 2**20) -> int:
+    # Rows of RGBA pixels fitting in `nbytes`
+    return max(1, nbytes // (4 * max(width, 1)))
+
+
+def draw_tiled(obj: Object, canvas: Canvas, tile_size: Size = Size(1024, 1024)):
+    # Draws one tile after the other, each one only touches its own region of the
+    # canvas and the objects intersecting it.
+    for box in iter_tiles(obj.size, tile_size):
+        box = intersect(box, canvas.box)
+        if box is not None:
+            obj.draw(canvas, Position(), box)
+
+
+def save_mapped(
+    obj: Object,
+    path: str | PathLike,
+    tile_size: Size = Size(1024, 1024),
+    compress_level: int = 6,
+    scratch_dir: str | PathLike | None = None,
+):
+    # Unlike save_tiled, tiles of any shape are drawn at once into a memory-mapped
+    # canvas in `scratch_dir` (the system temporary folder by default), which is
+    # then streamed to the PNG encoder.
+    size = obj.size
+    with MappedCanvas(size, folder=scratch_dir) as canvas:
+        draw_tiled(obj, canvas, tile_size)
+        with open(path, "wb") as file:
+            writer = PNGWriter(file, size, compress_level)
+            for band in canvas.iter_bands():
+                writer.write_array(band)
+            writer.close()
+
+
+# Rasters travel between processes as raw buffers rather than pickled images
+Raster = tuple[str, tuple[int, int], bytes]
+
+
+def to_raster(image: Image.Image) -> Raster:
+    return (image.mode, image.size, image.tobytes())
+
+
+def from_raster(raster: Raster) -> Image.Image:
+    return Image.frombytes(*raster)
+
+
+def _render_body(obj: Object) -> Raster:
+    return to_raster(obj.render_body())
+
+
+def _render_image(obj: Object) -> Raster:
+    return to_raster(obj.image)
+
+
+_worker_object: Object | None = None
+
+
+def _set_worker_object(obj: Object):
+    global _worker_object
+    _worker_object = obj
+
+
+def _render_worker_region(box: Box) -> Raster:
+    assert _worker_object is not None
+    return to_raster(render_region(_worker_object, box))
+
+
+def render_parallel(
+    obj: ComposedObject,
+    jobs: int | None = None,
+    tile_size: Size | None = None,
+) -> Image.Image:
+    # Without a tile size, each child of `obj` (ex: the nodes of a Cluster) is a
+    # task, only once per structure if `obj` is instanced. With a tile size, the
+    # object tree is sent once to each worker and tiles are the tasks.
+    canvas = new_canvas(obj.size)
+
+    if tile_size is not None:
+        boxes = list(iter_tiles(obj.size, tile_size))
+        with ProcessPoolExecutor(
+            jobs, initializer=_set_worker_object, initargs=(obj,)
+        ) as executor:
+            for box, raster in zip(boxes, executor.map(_render_worker_region, boxes)):
+                canvas.paste(from_raster(raster), Position(*box[:2]), canvas.box)
+        return canvas.image
+
+    canvas.fill(canvas.box, obj.background_color)
+    positions = [Position(x, y) for (x, y) in obj.layout.get_positions().tolist()]
+
+    if obj.instanced:
+        tasks = {}
+        for child in obj.objects:
+            if child.structure_key not in instance_cache:
+                tasks.setdefault(child.structure_key, child)
+        render = _render_body
+    else:
+        tasks = {i: child for i, child in enumerate(obj.objects)}
+        render = _render_image
+
+    workers = jobs or os.cpu_count() or 1
+    with ProcessPoolExecutor(workers) as executor:
+        chunksize = max(1, len(tasks) // (4 * workers))
+        rasters = dict(
+            zip(tasks.keys(), executor.map(render, tasks.values(), chunksize=chunksize))
+        )
+
+    if obj.instanced:
+        # Bodies are held here while painting, the cached ones found before
+        # rendering may have been evicted meanwhile
+        bodies = {
+            key: instance_cache.get(key, lambda raster=raster: from_raster(raster))
+            for key, raster in rasters.items()
+        }
+        for child in obj.objects:
+            if child.structure_key not in bodies:
+                bodies[child.structure_key] = instance_cache.get(
+                    child.structure_key,
+                    lambda child=child: observe_render(child, child.render_body),
+                )
+
+    for i, (child, position) in enumerate(zip(obj.objects, positions)):
+        if obj.instanced:
+            canvas.paste(bodies[child.structure_key], position, canvas.box)
+            child.draw_overlay(canvas, position, canvas.box)
+        else:
+            canvas.paste(from_raster(rasters[i]), position, canvas.box)
+
+    return canvas.image
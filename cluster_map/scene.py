@@ -0,0 +1,331 @@
+import json
+from dataclasses import dataclass, field
+from os import PathLike
+from typing import BinaryIO, Hashable
+
+import numpy as np
+from PIL import Image
+
+from cluster_map.architecture import (
+    Box,
+    Canvas,
+    ComposedObject,
+    ImageObject,
+    Node,
+    Object,
+    Position,
+    Rectangle,
+    Size,
+    get_asset_detail,
+    intersect,
+    new_canvas,
+)
+
+# Kinds of scene entries
+FILL = 0  # Background of a composed object, asset is a color
+RECTANGLE = 1  # Opaque rectangle, asset is a color
+IMAGE = 2  # Resized asset, asset is (image path, resample, glyph and thumbnail size)
+RASTER = 3  # Any other object, asset indexes a pre-rendered image
+
+ENTRY_DTYPE = np.int32
+
+SCENE_ARRAYS = [
+    "parent",
+    "kind",
+    "asset",
+    "x",
+    "y",
+    "width",
+    "height",
+    "rotation",
+    "glyph",
+    "glyph_color",
+    "clip",
+]
+
+
+@dataclass
+class Scene:
+    # Flattened object tree, one entry per object in drawing order with absolute
+    # positions and the clipping box inherited from its ancestors.
+    size: Size
+    parent: np.ndarray
+    kind: np.ndarray
+    asset: np.ndarray
+    x: np.ndarray
+    y: np.ndarray
+    width: np.ndarray
+    height: np.ndarray
+    rotation: np.ndarray
+    # Largest side up to which an entry is drawn as a flat color, 0 if never, and
+    # that color packed as RGBA
+    glyph: np.ndarray
+    glyph_color: np.ndarray
+    clip: np.ndarray
+    assets: list[Hashable]
+    rasters: dict[int, Image.Image] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.kind)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, name).nbytes for name in SCENE_ARRAYS)
+
+    def save(self, file: str | PathLike | BinaryIO):
+        # Rasters are stored as arrays, other assets as JSON lists
+        arrays = {name: getattr(self, name) for name in SCENE_ARRAYS}
+        for i, image in self.rasters.items():
+            arrays[f"raster{i}"] = np.asarray(image.convert("RGBA"))
+        np.savez(
+            file,
+            size=np.array(self.size.tuple()),
+            assets=np.array(
+                json.dumps(
+                    [encode_asset(asset, i) for i, asset in enumerate(self.assets)]
+                )
+            ),
+            **arrays,
+        )
+
+    @classmethod
+    def load(cls, file: str | PathLike | BinaryIO) -> "Scene":
+        with np.load(file) as data:
+            return cls(
+                size=Size(*data["size"].tolist()),
+                assets=[
+                    decode_asset(asset) for asset in json.loads(str(data["assets"]))
+                ],
+                rasters={
+                    int(name[len("raster") :]): Image.fromarray(data[name])
+                    for name in data.files
+                    if name.startswith("raster")
+                },
+                **{name: data[name] for name in SCENE_ARRAYS},
+            )
+
+    @property
+    def boxes(self) -> np.ndarray:
+        return np.stack(
+            [self.x, self.y, self.x + self.width, self.y + self.height], axis=1
+        )
+
+    def scaled_boxes(self, scale: float = 1) -> tuple[np.ndarray, np.ndarray]:
+        # Boxes and clipping boxes of the entries, edges are scaled rather than
+        # sizes so that adjacent entries stay adjacent.
+        if scale == 1:
+            return self.boxes, self.clip
+        return (
+            np.round(self.boxes * scale).astype(ENTRY_DTYPE),
+            np.round(self.clip * scale).astype(ENTRY_DTYPE),
+        )
+
+    def visible(self, box: Box, scale: float = 1) -> np.ndarray:
+        # Entries whose clipped box intersects `box`
+        (boxes, clip) = self.scaled_boxes(scale)
+        x0 = np.maximum(np.maximum(boxes[:, 0], clip[:, 0]), box[0])
+        y0 = np.maximum(np.maximum(boxes[:, 1], clip[:, 1]), box[1])
+        x1 = np.minimum(np.minimum(boxes[:, 2], clip[:, 2]), box[2])
+        y1 = np.minimum(np.minimum(boxes[:, 3], clip[:, 3]), box[3])
+        return np.flatnonzero((x0 < x1) & (y0 < y1))
+
+    def render(self, box: Box | None = None, scale: float = 1) -> Image.Image:
+        # `box` is in scaled coordinates, the whole scene if not set
+        if box is None:
+            box = (
+                0,
+                0,
+                round(self.size.width * scale),
+                round(self.size.height * scale),
+            )
+        canvas = new_canvas(
+            Size(box[2] - box[0], box[3] - box[1]), origin=Position(box[0], box[1])
+        )
+        self.draw(canvas, box, scale)
+        return canvas.image
+
+    def draw(self, canvas: Canvas, box: Box, scale: float = 1):
+        # Descendants of entries drawn as a glyph are skipped, parents always come
+        # before their children.
+        (boxes, clips) = self.scaled_boxes(scale)
+        collapsed = set()
+        for i in self.visible(box, scale).tolist():
+            if self.parent[i] in collapsed:
+                collapsed.add(i)
+            elif self.draw_entry(
+                canvas, i, tuple(boxes[i].tolist()), tuple(clips[i].tolist())
+            ):
+                collapsed.add(i)
+
+    def draw_entry(self, canvas: Canvas, i: int, box: Box, clip: Box) -> bool:
+        # Returns whether the entry was drawn as a glyph
+        kind = self.kind[i]
+        asset = self.assets[self.asset[i]]
+        position = Position(box[0], box[1])
+        size = (box[2] - box[0], box[3] - box[1])
+
+        if self.glyph[i] and max(size) <= self.glyph[i]:
+            box = intersect(clip, box)
+            if box is not None:
+                canvas.fill(box, unpack_color(int(self.glyph_color[i])))
+            return True
+
+        if kind == FILL:
+            canvas.fill(clip, asset)
+        elif kind == RECTANGLE:
+            box = intersect(clip, box)
+            if box is not None:
+                canvas.fill(box, asset)
+        elif min(size) <= 0:
+            # Entries scaled down to nothing
+            return False
+        elif kind == IMAGE:
+            (image_path, resample, glyph_size, thumbnail_size) = asset
+            image = get_asset_detail(
+                image_path,
+                float(self.rotation[i]),
+                size,
+                resample,
+                glyph_size,
+                thumbnail_size,
+            )
+            canvas.paste(image, position, clip)
+        elif kind == RASTER:
+            image = self.rasters[int(self.asset[i])]
+            if image.size != size:
+                image = image.resize(size)
+            canvas.paste(image, position, clip)
+        return False
+
+
+def pack_color(color: tuple[int, ...]) -> int:
+    return int.from_bytes(bytes((*color[:3], color[3] if len(color) > 3 else 255)))
+
+
+def unpack_color(color: int) -> tuple[int, int, int, int]:
+    return tuple(color.to_bytes(4))
+
+
+def encode_asset(asset: Hashable, index: int) -> list:
+    # Raster keys hold types and are only needed while compiling, the index is kept
+    if isinstance(asset, tuple) and asset[:1] == ("raster",):
+        return ["raster", index]
+    return list(asset)
+
+
+def decode_asset(asset: list) -> Hashable:
+    if isinstance(asset[0], str) and asset[0] != "raster":
+        (image_path, resample, glyph_size, thumbnail_size) = asset
+        if resample is not None:
+            resample = Image.Resampling(resample)
+        return (image_path, resample, glyph_size, thumbnail_size)
+    return tuple(asset)
+
+
+class SceneBuilder:
+    def __init__(self):
+        self.entries: list[tuple] = []
+        self.assets: list[Hashable] = []
+        self.asset_ids: dict[Hashable, int] = {}
+        self.rasters: dict[int, Image.Image] = {}
+
+    def asset_id(self, asset: Hashable) -> int:
+        if asset not in self.asset_ids:
+            self.asset_ids[asset] = len(self.assets)
+            self.assets.append(asset)
+        return self.asset_ids[asset]
+
+    def add(self, obj: Object, parent: int, position: Position, clip: Box):
+        index = len(self.entries)
+
+        if isinstance(obj, ComposedObject):
+            (width, height) = obj.layout.size.tuple()
+            clip = intersect(
+                clip, (position.x, position.y, position.x + width, position.y + height)
+            )
+            if clip is None:
+                return
+            glyph = (0, 0)
+            if isinstance(obj, Node):
+                glyph = (obj.glyph_size, pack_color(obj.glyph_color))
+            self.append(
+                parent,
+                FILL,
+                self.asset_id(obj.background_color),
+                position,
+                obj.size,
+                clip,
+                glyph=glyph,
+            )
+            positions = obj.layout.get_positions()[: len(obj.objects)]
+            positions = (positions + position.tuple()).tolist()
+            for child, (x, y) in zip(obj.objects, positions):
+                self.add(child, index, Position(x, y), clip)
+        elif isinstance(obj, Rectangle):
+            color = (*obj.color[:3], 255)
+            self.append(
+                parent, RECTANGLE, self.asset_id(color), position, obj.size, clip
+            )
+        elif isinstance(obj, ImageObject):
+            asset = self.asset_id(
+                (str(obj.image_path), obj.resample, obj.glyph_size, obj.thumbnail_size)
+            )
+            self.append(parent, IMAGE, asset, position, obj.size, clip, obj.rotation)
+        else:
+            image = obj.image
+            asset = self.asset_id(("raster", obj.structure_key, obj.overlay_key))
+            self.rasters[asset] = image
+            self.append(parent, RASTER, asset, position, Size(*image.size), clip)
+
+    def append(
+        self,
+        parent: int,
+        kind: int,
+        asset: int,
+        position: Position,
+        size: Size,
+        clip: Box,
+        rotation: float = 0,
+        glyph: tuple[int, int] = (0, 0),
+    ):
+        self.entries.append(
+            (
+                parent,
+                kind,
+                asset,
+                position.x,
+                position.y,
+                int(size.width),
+                int(size.height),
+                rotation,
+                *glyph,
+                *clip,
+            )
+        )
+
+    def build(self, size: Size) -> Scene:
+        entries = np.array(self.entries, dtype=float).reshape(-1, 14)
+        columns = entries.T
+        return Scene(
+            size=size,
+            parent=columns[0].astype(ENTRY_DTYPE),
+            kind=columns[1].astype(np.int8),
+            asset=columns[2].astype(ENTRY_DTYPE),
+            x=columns[3].astype(ENTRY_DTYPE),
+            y=columns[4].astype(ENTRY_DTYPE),
+            width=columns[5].astype(ENTRY_DTYPE),
+            height=columns[6].astype(ENTRY_DTYPE),
+            rotation=columns[7],
+            glyph=columns[8].astype(ENTRY_DTYPE),
+            glyph_color=columns[9].astype(np.uint32),
+            clip=entries[:, 10:].astype(ENTRY_DTYPE),
+            assets=self.assets,
+            rasters=self.rasters,
+        )
+
+
+def compile_scene(obj: Object) -> Scene:
+    size = obj.size
+    builder = SceneBuilder()
+    builder.add(obj, -1, Position(), (0, 0, int(size.width), int(size.height)))
+    return builder.build(size)
@@ -0,0 +1,246 @@
+import json
+import re
+from dataclasses import dataclass
+from os import PathLike
+from typing import Iterable, Iterator, Literal
+
+import hostlist
+
+from cluster_map.architecture import Cluster, Node, Size
+from cluster_map.nodes import NodeShape, assemble_cluster, build_node, copy_node
+
+Format = Literal["scontrol", "sinfo", "json"]
+
+# Assets of the GPU models found in Gres strings, ex: gpu:v100l:4(S:0-1)
+GPU_ASSETS = {
+    "p100": "p100.jpg",
+    "p100l": "p100.jpg",
+    "v100": "v100.jpg",
+    "v100l": "v100.jpg",
+    "v100_sxm": "v100_sxm.jpg",
+    "a100": "a100_sxm.jpg",
+    "a100_sxm": "a100_sxm.jpg",
+    "a100_pci": "a100_pci.jpg",
+    "rtx8000": "quadro_rtx_800_b.jpg",
+}
+DEFAULT_GPU_ASSET = "v100.jpg"
+
+DIMM_MEMORY = 32 * 1024  # MB
+
+# Node states drawn as a color, by decreasing severity. Other states (idle,
+# allocated, mixed...) keep the default node colors.
+STATE_COLORS = {
+    "down": (214, 39, 40, 255),
+    "fail": (214, 39, 40, 255),
+    "drain": (255, 127, 14, 255),
+    "maint": (148, 103, 189, 255),
+    "reserved": (31, 119, 180, 255),
+}
+
+# sinfo columns, as printed by --Format or the default headers
+SINFO_COLUMNS = {
+    "NODELIST": "name",
+    "HOSTNAMES": "name",
+    "SOCKETS": "sockets",
+    "MEMORY": "memory",
+    "GRES": "gres",
+    "STATE": "state",
+    "S:C:T": "sockets",
+}
+
+# Fields read from scontrol dumps, their values never contain spaces
+SCONTROL_KEYS = {
+    "Sockets": "sockets",
+    "RealMemory": "memory",
+    "Gres": "gres",
+    "State": "state",
+}
+SCONTROL_FIELD = re.compile(r"(?:^|\s)(NodeName|Sockets|RealMemory|Gres|State)=(\S*)")
+
+
+@dataclass
+class NodeRecord:
+    # `name` is a hostlist expression, a single host for scontrol dumps
+    name: str
+    state: str = "unknown"
+    sockets: int = 2
+    memory: int = 0
+    gres: str = ""
+
+    @property
+    def shape(self) -> NodeShape:
+        (gpu, gpus) = parse_gpus(self.gres)
+        dimms = max(1, round(self.memory / DIMM_MEMORY))
+        return NodeShape(
+            1,
+            gpu=gpu,
+            gpus=gpus,
+            cpus=self.sockets,
+            dimms=dimms,
+            dimm_columns=1 if dimms <= 6 else 2,
+        )
+
+
+def parse_count(value: str) -> int:
+    # sinfo marks heterogeneous groups with a trailing +, ex: 128000+
+    return int(value.rstrip("+").split(":")[0])
+
+
+def parse_gpus(gres: str) -> tuple[str, int]:
+    # Asset and number of GPUs, ex: gpu:p100:4(S:0-1),gpu:p100l:2 -> p100.jpg, 6
+    asset = DEFAULT_GPU_ASSET
+    count = 0
+    for resource in re.sub(r"\(.*?\)", "", gres).split(","):
+        parts = resource.split(":")
+        if parts[0] != "gpu" or len(parts) < 2:
+            continue
+        if not parts[-1].isdigit():
+            parts.append("1")
+        if len(parts) > 2 and count == 0:
+            asset = GPU_ASSETS.get(parts[1].lower(), DEFAULT_GPU_ASSET)
+        count += int(parts[-1])
+    return asset, count
+
+
+def make_record(fields: dict[str, str]) -> NodeRecord:
+    record = NodeRecord(name=fields["name"])
+    if fields.get("state"):
+        record.state = fields["state"].lower()
+    if fields.get("sockets"):
+        record.sockets = parse_count(fields["sockets"])
+    if fields.get("memory"):
+        record.memory = parse_count(fields["memory"])
+    if fields.get("gres") and fields["gres"] != "(null)":
+        record.gres = fields["gres"]
+    return record
+
+
+def parse_scontrol(lines: Iterable[str]) -> Iterator[NodeRecord]:
+    # `scontrol show node` dumps, multi-line records or one per line (-o)
+    fields: dict[str, str] = {}
+    for line in lines:
+        for key, value in SCONTROL_FIELD.findall(line):
+            if key == "NodeName":
+                if fields:
+                    yield make_record(fields)
+                fields = {"name": value}
+            else:
+                fields[SCONTROL_KEYS[key]] = value
+    if fields:
+        yield make_record(fields)
+
+
+def parse_sinfo(lines: Iterable[str]) -> Iterator[NodeRecord]:
+    # sinfo tables, the first line holds the column headers, ex:
+    #   sinfo -N -o "%N %X %m %G %T"
+    columns = None
+    for line in lines:
+        values = line.split()
+        if not values:
+            continue
+        if columns is None:
+            columns = [SINFO_COLUMNS.get(header.upper()) for header in values]
+            if "name" not in columns:
+                raise ValueError(f"No node list column in sinfo header: {line!r}")
+            continue
+        yield make_record(
+            {column: value for column, value in zip(columns, values) if column}
+        )
+
+
+def parse_json(lines: Iterable[str]) -> Iterator[NodeRecord]:
+    # One JSON object per line with the fields of NodeRecord, ex:
+    #   {"name": "cdr[1-114]", "sockets": 2, "memory": 128000, "gres": "gpu:p100:4"}
+    for line in lines:
+        if line.strip():
+            yield NodeRecord(**json.loads(line))
+
+
+PARSERS = {"scontrol": parse_scontrol, "sinfo": parse_sinfo, "json": parse_json}
+
+
+def detect_format(path: str | PathLike) -> Format:
+    if str(path).endswith((".json", ".jsonl")):
+        return "json"
+    with open(path) as file:
+        for line in file:
+            if line.strip():
+                return "scontrol" if line.lstrip().startswith("NodeName=") else "sinfo"
+    return "sinfo"
+
+
+def read_records(
+    path: str | PathLike, format: Format | None = None
+) -> Iterator[NodeRecord]:
+    # Records are streamed, the dump is never loaded whole
+    parser = PARSERS[format or detect_format(path)]
+    with open(path) as file:
+        yield from parser(file)
+
+
+def expand_hostlist(name: str) -> list[str]:
+    if "[" not in name and "," not in name:
+        return [name]
+    return hostlist.expand_hostlist(name)
+
+
+def expand_records(records: Iterable[NodeRecord]) -> Iterator[tuple[str, NodeRecord]]:
+    # A host listed in several records (ex: in many partitions) keeps the first one
+    seen = set()
+    for record in records:
+        for host in expand_hostlist(record.name):
+            if host not in seen:
+                seen.add(host)
+                yield host, record
+
+
+def state_color(state: str) -> tuple[int, int, int, int] | None:
+    # Color of the most severe state of the node, ex: idle+drain*, None if healthy
+    flags = [flag.rstrip("*~#!%$@^-") for flag in state.split("+")]
+    for prefix, color in STATE_COLORS.items():
+        if any(flag.startswith(prefix) for flag in flags):
+            return color
+    return None
+
+
+def build_nodes(records: Iterable[NodeRecord]) -> Iterator[Node]:
+    # Every host gets a copy of the node of its shape (see copy_node), nodes in a
+    # notable state are drawn in its color.
+    templates: dict[tuple, Node] = {}
+    shape_keys: dict[tuple, tuple] = {}
+    colors: dict[str, tuple[int, int, int, int] | None] = {}
+    for host, record in expand_records(records):
+        fields = (record.gres, record.sockets, record.memory)
+        if fields not in shape_keys:
+            shape = record.shape
+            key = (shape.gpu, shape.gpus, shape.cpus, shape.dimms, shape.dimm_columns)
+            shape_keys[fields] = key
+            if key not in templates:
+                templates[key] = build_node(shape, host)
+        node = copy_node(templates[shape_keys[fields]], host)
+        if record.state not in colors:
+            colors[record.state] = state_color(record.state)
+        color = colors[record.state]
+        if color is not None:
+            node.background_color = color
+            node.glyph_color = color
+        yield node
+
+
+def build_cluster(
+    records: Iterable[NodeRecord],
+    name: str,
+    grid: Size | None = None,
+    size: Size = Size(10000, 10000),
+) -> Cluster:
+    return assemble_cluster(name, build_nodes(records), grid, size)
+
+
+def load_cluster(
+    path: str | PathLike,
+    name: str,
+    format: Format | None = None,
+    grid: Size | None = None,
+    size: Size = Size(10000, 10000),
+) -> Cluster:
+    return build_cluster(read_records(path, format), name, grid, size)
@@ -0,0 +1,92 @@
+import dataclasses
+import hashlib
+import json
+import os
+import tomllib
+from os import PathLike
+
+from cluster_map.architecture import IMAGE_FOLDER, Size
+from cluster_map.nodes import FleetShape, NodeShape, build_cluster
+from cluster_map.scene import Scene, compile_scene
+
+# Bump when the compiled scenes change for the same spec
+SCENE_CACHE_VERSION = 3
+
+
+def default_cache_dir() -> str:
+    cache_home = os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache"))
+    return os.path.join(cache_home, "cluster_map")
+
+
+def parse_spec(data: dict) -> FleetShape:
+    # Node entries may refer to a node type for their defaults, ex:
+    #   [node_types.p100]
+    #   gpu = "p100.jpg"
+    #   [[nodes]]
+    #   type = "p100"
+    #   count = 114
+    node_types = data.get("node_types", {})
+    nodes = []
+    for entry in data["nodes"]:
+        entry = dict(entry)
+        node_type = entry.pop("type", None)
+        if node_type is not None:
+            if node_type not in node_types:
+                raise ValueError(f"Unknown node type {node_type!r}")
+            entry = {**node_types[node_type], **entry}
+        nodes.append(NodeShape(**entry))
+
+    fleet = FleetShape(name=data["name"], nodes=nodes)
+    if "grid" in data:
+        fleet.grid = Size(*data["grid"])
+    if "size" in data:
+        fleet.size = Size(*data["size"])
+    return fleet
+
+
+def load_spec(path: str | PathLike) -> FleetShape:
+    # TOML or JSON, based on the extension
+    if str(path).endswith(".json"):
+        with open(path, encoding="utf-8") as file:
+            return parse_spec(json.load(file))
+    with open(path, "rb") as file:
+        return parse_spec(tomllib.load(file))
+
+
+def spec_key(fleet: FleetShape) -> str:
+    # The layout depends on the aspect ratio of the assets, changing one of them
+    # must not reuse a scene compiled with the previous version.
+    assets = sorted(
+        {
+            os.path.join(IMAGE_FOLDER, asset)
+            for shape in fleet.nodes
+            for asset in (shape.gpu, shape.cpu, shape.ram)
+        }
+    )
+    stats = [(asset, os.stat(asset).st_mtime_ns) for asset in assets]
+    content = json.dumps(
+        [SCENE_CACHE_VERSION, dataclasses.asdict(fleet), stats], sort_keys=True
+    )
+    return hashlib.sha256(content.encode()).hexdigest()[:16]
+
+
+def cached_scene(fleet: FleetShape, cache_dir: str | PathLike | None = None) -> Scene:
+    # Unchanged specs skip the construction of the object tree and the layout
+    if cache_dir is None:
+        cache_dir = default_cache_dir()
+    path = os.path.join(cache_dir, f"{fleet.name}-{spec_key(fleet)}.npz")
+    if os.path.exists(path):
+        return Scene.load(path)
+
+    scene = compile_scene(build_cluster(fleet))
+    os.makedirs(cache_dir, exist_ok=True)
+    # Written aside and moved so concurrent renders never read a partial file
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as file:
+        scene.save(file)
+    os.replace(tmp_path, path)
+    return scene
+
+
+def load_scene(path: str | PathLike, cache_dir: str | PathLike | None = None) -> Scene:
+    return cached_scene(load_spec(path), cache_dir)
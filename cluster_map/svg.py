@@ -0,0 +1,209 @@
+import base64
+import io
+import math
+import os
+from os import PathLike
+from typing import Hashable, TextIO
+from xml.sax.saxutils import escape, quoteattr
+
+from PIL import Image
+
+from cluster_map.architecture import (
+    BoundingBox,
+    ComposedObject,
+    ImageObject,
+    Object,
+    Position,
+    Rectangle,
+    Size,
+    get_asset,
+)
+
+MIME_TYPES = {".png": "image/png", ".jpg": "image/jpeg", ".jpeg": "image/jpeg"}
+
+
+def color_attributes(name: str, color: tuple[int, ...]) -> str:
+    (red, green, blue) = color[:3]
+    attributes = f'{name}="rgb({red},{green},{blue})"'
+    if len(color) > 3 and color[3] < 255:
+        attributes += f' {name}-opacity="{color[3] / 255:.3g}"'
+    return attributes
+
+
+def data_uri(data: bytes, mime_type: str) -> str:
+    return f"data:{mime_type};base64,{base64.b64encode(data).decode('ascii')}"
+
+
+def image_uri(image: Image.Image) -> str:
+    with io.BytesIO() as output:
+        image.save(output, format="PNG")
+        return data_uri(output.getvalue(), "image/png")
+
+
+class SVGWriter:
+    # Streaming SVG output. Assets and the bodies of instanced objects are defined
+    # once as <symbol> when first met and referenced with <use> afterwards.
+    def __init__(self, file: TextIO, size: Size, embed: bool = True):
+        self.file = file
+        self.size = size
+        self.embed = embed
+        self.symbols: dict[Hashable, str] = {}
+
+        self.file.write(
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<svg xmlns="http://www.w3.org/2000/svg" '
+            'xmlns:xlink="http://www.w3.org/1999/xlink" '
+            f'width="{size.width}" height="{size.height}" '
+            f'viewBox="0 0 {size.width} {size.height}">\n'
+        )
+
+    def symbol_id(self, key: Hashable) -> str | None:
+        # None when the symbol is new, its definition must then be written
+        if key in self.symbols:
+            return self.symbols[key]
+        self.symbols[key] = f"s{len(self.symbols)}"
+        return None
+
+    def use(self, symbol: str, position: Position, size: Size):
+        self.file.write(
+            f'<use xlink:href="#{symbol}" x="{position.x}" y="{position.y}" '
+            f'width="{size.width}" height="{size.height}"/>\n'
+        )
+
+    def write(self, obj: Object, position: Position = Position()):
+        self.write_body(obj, position)
+        self.write_overlay(obj, position)
+
+    def write_body(self, obj: Object, position: Position):
+        if isinstance(obj, ComposedObject):
+            self.write_composed(obj, position)
+        elif isinstance(obj, BoundingBox):
+            self.write_bounding_box(obj, position)
+        elif isinstance(obj, Rectangle):
+            (width, height) = obj.size.tuple()
+            self.file.write(
+                f'<rect x="{position.x}" y="{position.y}" width="{width}" '
+                f'height="{height}" {color_attributes("fill", obj.color[:3])}/>\n'
+            )
+        elif isinstance(obj, ImageObject):
+            self.write_image(obj, position)
+        else:
+            # Objects without a vector form are embedded as rasters
+            (width, height) = obj.image.size
+            self.file.write(
+                f'<image x="{position.x}" y="{position.y}" width="{width}" '
+                f'height="{height}" xlink:href="{image_uri(obj.image)}"/>\n'
+            )
+
+    def write_overlay(self, obj: Object, position: Position):
+        if isinstance(obj, BoundingBox):
+            self.file.write(
+                f'<text x="{position.x + obj.size.width / 2:g}" '
+                f'y="{position.y + obj.padding.top:g}" text-anchor="middle" '
+                f'dominant-baseline="hanging" font-family="sans-serif" '
+                f'font-size="10">{escape(obj.name)}</text>\n'
+            )
+
+    def write_composed(self, obj: ComposedObject, position: Position):
+        # Nested <svg> elements clip their content like the raster renderers
+        (width, height) = obj.layout.size.tuple()
+        self.file.write(
+            f'<svg x="{position.x}" y="{position.y}" width="{width}" '
+            f'height="{height}" overflow="hidden">\n'
+        )
+        if obj.background_color[3:] != (0,):
+            self.file.write(
+                f'<rect width="{width}" height="{height}" '
+                f'{color_attributes("fill", obj.background_color)}/>\n'
+            )
+        positions = obj.layout.get_positions()[: len(obj.objects)].tolist()
+        for child, (x, y) in zip(obj.objects, positions):
+            if obj.instanced:
+                self.write_instance(child, Position(x, y))
+            else:
+                self.write(child, Position(x, y))
+        self.file.write("</svg>\n")
+
+    def write_instance(self, obj: Object, position: Position):
+        symbol = self.symbol_id(("instance", obj.structure_key))
+        (width, height) = obj.size.tuple()
+        if symbol is None:
+            symbol = self.symbols[("instance", obj.structure_key)]
+            self.file.write(
+                f'<symbol id="{symbol}" viewBox="0 0 {width} {height}" '
+                'overflow="hidden">\n'
+            )
+            self.write_body(obj, Position())
+            self.file.write("</symbol>\n")
+        self.use(symbol, position, obj.size)
+        self.write_overlay(obj, position)
+
+    def write_bounding_box(self, obj: BoundingBox, position: Position):
+        # The outline is drawn inside the box, as with Pillow
+        (width, height) = obj.size.tuple()
+        inset = obj.width / 2
+        radius = obj.radius * (width + height) / 2
+        self.file.write(
+            f'<svg x="{position.x}" y="{position.y}" width="{width:g}" '
+            f'height="{height:g}" overflow="hidden">\n'
+        )
+        if obj.background_color[3:] != (0,):
+            self.file.write(
+                f'<rect width="{width:g}" height="{height:g}" '
+                f'{color_attributes("fill", obj.background_color)}/>\n'
+            )
+        self.file.write(
+            f'<rect x="{inset:g}" y="{inset:g}" width="{width - obj.width:g}" '
+            f'height="{height - obj.width:g}" rx="{max(0, radius - inset):g}" '
+            f'{color_attributes("fill", obj.fill)} '
+            f'{color_attributes("stroke", obj.outline)} '
+            f'stroke-width="{obj.width}"/>\n'
+        )
+        self.write(obj.object, Position(int(obj.padding.left), int(obj.padding.top)))
+        self.file.write("</svg>\n")
+
+    def write_image(self, obj: ImageObject, position: Position):
+        image_path = os.fspath(obj.image_path)
+        rotation = obj.rotation % 360
+        symbol = self.symbol_id(("asset", image_path, rotation))
+        if symbol is None:
+            symbol = self.symbols[("asset", image_path, rotation)]
+            self.write_asset(symbol, image_path, rotation)
+        self.use(symbol, position, obj.size)
+
+    def write_asset(self, symbol: str, image_path: str, rotation: float):
+        # Pillow rotates counterclockwise around the center and expands the image
+        (width, height) = get_asset(image_path).size
+        (rotated_width, rotated_height) = get_asset(image_path, rotation).size
+        if self.embed:
+            with open(image_path, "rb") as file:
+                extension = os.path.splitext(image_path)[1].lower()
+                href = data_uri(file.read(), MIME_TYPES.get(extension, "image/png"))
+        else:
+            href = image_path
+        transform = ""
+        if rotation:
+            transform = (
+                f' transform="translate({rotated_width / 2:g} {rotated_height / 2:g}) '
+                f'rotate({-rotation:g}) translate({-width / 2:g} {-height / 2:g})"'
+            )
+        self.file.write(
+            f'<symbol id="{symbol}" viewBox="0 0 {rotated_width} {rotated_height}" '
+            'preserveAspectRatio="none">\n'
+            f'<image width="{width}" height="{height}"{transform} '
+            f"xlink:href={quoteattr(href)}/>\n"
+            "</symbol>\n"
+        )
+
+    def close(self):
+        self.file.write("</svg>\n")
+
+
+def save_svg(obj: Object, path: str | PathLike, embed: bool = True):
+    size = obj.size
+    with open(path, "w", encoding="utf-8") as file:
+        writer = SVGWriter(
+            file, Size(math.ceil(size.width), math.ceil(size.height)), embed
+        )
+        writer.write(obj)
+        writer.close()
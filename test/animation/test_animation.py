@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+from PIL import Image, ImageSequence
+
+from cluster_map.animation import iter_frames, save_animation
+from cluster_map.heatmap import Heatmap
+
+from heatmap.grids import build_grid
+
+SNAPSHOTS = [
+    np.array([0, 0.5, 1, np.nan]),
+    np.array([0, 0.5, 0, np.nan]),
+    np.array([0, 0.5, 0, np.nan]),
+    np.array([1, 0.5, 0, 0.2]),
+]
+
+
+def test_frames_blend_changed_components():
+    heatmap = Heatmap(build_grid())
+
+    frames = [(box, frame.copy()) for box, frame in iter_frames(heatmap, SNAPSHOTS)]
+
+    assert [box for box, _ in frames] == [
+        (0, 0, 40, 40),
+        (0, 20, 10, 30),
+        None,
+        (0, 0, 30, 30),
+    ]
+    for (_, frame), values in zip(frames, SNAPSHOTS):
+        assert frame.tobytes() == heatmap.render(values).tobytes()
+
+
+def test_save_apng(tmp_path):
+    obj = build_grid()
+    heatmap = Heatmap(obj)
+
+    save_animation(obj, tmp_path / "map.png", iter(SNAPSHOTS), frames=4, duration=50)
+
+    with Image.open(tmp_path / "map.png") as image:
+        assert image.n_frames == 4
+        for frame, values in zip(ImageSequence.Iterator(image), SNAPSHOTS):
+            assert frame.info["duration"] == 50
+            assert frame.convert("RGBA").tobytes() == heatmap.render(values).tobytes()
+
+
+def test_save_apng_frame_count(tmp_path):
+    with pytest.raises(ValueError, match="Only 4 of 5 frames"):
+        save_animation(build_grid(), tmp_path / "map.png", SNAPSHOTS, frames=5)
+
+
+def test_save_gif(tmp_path):
+    save_animation(build_grid(), tmp_path / "map.gif", SNAPSHOTS)
+
+    with Image.open(tmp_path / "map.gif") as image:
+        assert image.size == (40, 40)
+        assert image.n_frames > 1
@@ -1,14 +1,31 @@
+import copy
+import gc
 import io
+import pickle
+import weakref
 
+import numpy as np
+from PIL import Image, ImageDraw
+
+from cluster_map import architecture
 from cluster_map.architecture import (
+    ArrayCanvas,
+    BoundingBox,
+    Canvas,
+    Cluster,
     ComposedObject,
     Layout,
     Object,
     Padding,
+    Position,
     Rectangle,
     Size,
+    alpha_composite,
+    instance_cache,
 )
 
+from helpers import build_node
+
 
 def to_bytes(obj: Object):
     with io.BytesIO() as output:
@@ -171,3 +188,364 @@ def test_nested_mix(image_regression):
     )
 
     image_regression.check(to_bytes(obj))
+
+
+def build_grid():
+    objects = [Rectangle(name=str(i)) for i in range(4)]
+    for obj in objects:
+        obj.size = Size(5, 5)
+
+    return ComposedObject(
+        name="composed",
+        layout=Layout(Size(2, 2), Size(40, 40)),
+        objects=objects,
+    )
+
+
+def test_image_is_cached():
+    obj = build_grid()
+
+    assert obj.image is obj.image
+    assert obj.objects[0].image is obj.objects[0].image
+
+
+def test_child_change_invalidates_parents():
+    obj = build_grid()
+    parent = ComposedObject(
+        name="parent",
+        layout=Layout(Size(1, 1), Size(80, 80)),
+        objects=[obj],
+    )
+    image = parent.image
+    sibling_image = obj.objects[1].image
+
+    obj.objects[0].color = (0, 0, 255, 255)
+
+    assert parent.image is not image
+    assert to_bytes(parent) != to_bytes(
+        ComposedObject(
+            name="parent",
+            layout=Layout(Size(1, 1), Size(80, 80)),
+            objects=[build_grid()],
+        )
+    )
+    assert obj.objects[1].image is sibling_image
+
+
+def test_discarded_parents_are_collected():
+    obj = build_grid()
+    parents = [
+        ComposedObject(
+            name=f"parent{i}",
+            layout=Layout(Size(1, 1), Size(80, 80)),
+            objects=[obj],
+        )
+        for i in range(5)
+    ]
+    for parent in parents:
+        parent.image
+    refs = [weakref.ref(parent) for parent in parents]
+    layout = parents[0].layout
+
+    del parent, parents
+    gc.collect()
+
+    assert all(ref() is None for ref in refs)
+    # Children and layouts outliving their parents can still be changed
+    obj.objects[0].color = (0, 0, 255, 255)
+    layout.valign = "bottom"
+    assert obj._parents == {}
+
+
+def test_size_change_invalidates():
+    obj = build_grid()
+    image = obj.image
+
+    obj.size = Size(80, 80)
+
+    assert obj.image is not image
+    assert obj.image.size == (80, 80)
+
+
+def test_layout_change_invalidates():
+    obj = build_grid()
+    image = obj.image
+
+    obj.layout.valign = "bottom"
+
+    assert obj.image is not image
+
+
+def test_replaced_children_are_released():
+    obj = build_grid()
+    old_children = obj.objects
+    obj.objects = [Rectangle(name="new", _size=Size(5, 5))]
+    image = obj.image
+
+    old_children[0].color = (0, 0, 255, 255)
+
+    assert obj.image is image
+
+
+def test_unknown_objects_are_never_identical():
+    # Collected objects leave their id to the next ones, not their key
+    keys = {Object(name="obj").structure_key for _ in range(100)}
+    assert len(keys) == 100
+
+    obj = Object(name="obj")
+    assert copy.deepcopy(obj).structure_key != obj.structure_key
+    assert pickle.loads(pickle.dumps(obj)).structure_key != obj.structure_key
+
+
+def test_deepcopy_is_independent():
+    obj = build_grid()
+    image = to_bytes(obj)
+    clone = copy.deepcopy(obj)
+
+    assert to_bytes(clone) == image
+    assert clone.objects[0] is not obj.objects[0]
+    assert clone.objects[0]._parents[id(clone)]() is clone
+    assert clone.layout is not obj.layout
+    assert clone.structure_key == obj.structure_key
+
+    clone.layout.valign = "center"
+    assert to_bytes(obj) == image
+
+    obj.objects[0].color = (0, 0, 255, 255)
+    assert to_bytes(obj) != image
+    assert clone.objects[0].color != obj.objects[0].color
+
+
+def test_deepcopy_node_keeps_parts():
+    node = build_node("node")
+    clone = copy.deepcopy(node)
+
+    assert clone.objects == [clone.gpus, clone.cpus, clone.ram]
+    assert clone.gpus is not node.gpus
+    assert to_bytes(clone) == to_bytes(node)
+
+
+def test_instanced_cluster_renders_distinct_nodes_once():
+    nodes = [build_node(f"node{i}") for i in range(5)]
+    nodes.append(build_node("blue", color=(0, 0, 255, 255)))
+    cluster = Cluster(
+        name="cluster", layout=Layout(Size(3, 2), Size(100, 100)), nodes=nodes
+    )
+    instance_cache.clear()
+    misses = instance_cache.misses
+
+    image = cluster.image
+
+    assert instance_cache.misses == misses + 2
+    reference = ComposedObject(
+        name="reference",
+        layout=Layout(Size(3, 2), Size(100, 100)),
+        objects=[build_node(node.name, node.gpus.objects[0].color) for node in nodes],
+    )
+    assert image.tobytes() == reference.image.tobytes()
+
+
+def test_instanced_labels_are_drawn_per_instance():
+    def build(instanced):
+        boxes = [
+            BoundingBox(
+                name=f"box{i}",
+                object=Rectangle(name=str(i), _size=Size(30, 30)),
+                padding=Padding(5, 5, 5, 5),
+                width=2,
+            )
+            for i in range(4)
+        ]
+        return ComposedObject(
+            name="boxes",
+            layout=Layout(Size(2, 2), Size(100, 100)),
+            objects=boxes,
+            instanced=instanced,
+        )
+
+    instanced = build(instanced=True)
+    assert instanced.objects[0].structure_key == instanced.objects[1].structure_key
+    assert instanced.image.tobytes() == build(instanced=False).image.tobytes()
+
+
+def nested_image(obj: Object):
+    # Reference compositing, one intermediate image per nesting level
+    if not isinstance(obj, ComposedObject):
+        return obj.render()
+
+    image = Image.new("RGBA", obj.layout.size.tuple(), color=obj.background_color)
+    for i, child in enumerate(obj.objects):
+        image.paste(nested_image(child), obj.layout.get_position(i).tuple())
+    return image
+
+
+def test_single_canvas_matches_nested_compositing():
+    # Oversized children must be clipped to their parent as when pasting
+    overflowing = [Rectangle(name=str(i), color=(0, 255, 0, 255)) for i in range(2)]
+    overflowing[0].size = Size(80, 10)
+    overflowing[1].size = Size(10, 10)
+
+    inner = ComposedObject(
+        name="inner",
+        background_color=(0, 0, 0),
+        layout=Layout(Size(2, 1), Size(30, 20), valign="center", halign="right"),
+        objects=overflowing,
+    )
+    box = BoundingBox(
+        name="box",
+        object=build_grid(),
+        padding=Padding(5, 5, 5, 5),
+        width=2,
+    )
+    obj = ComposedObject(
+        name="composed",
+        layout=Layout(Size(3, 1), Size(150, 60), valign="center"),
+        objects=[inner, box, build_grid()],
+    )
+
+    assert obj.image.tobytes() == nested_image(obj).tobytes()
+
+
+def test_child_sizes_follow_children():
+    obj = build_grid()
+    assert obj.child_sizes.tolist() == [[5, 5]] * 4
+
+    obj.objects[2].size = Size(3, 6)
+    assert obj.child_sizes[2].tolist() == [3, 6]
+
+    obj.objects.append(Rectangle(name="unset"))
+    assert obj.child_sizes.shape == (5, 2)
+    assert np.isnan(obj.child_sizes[4]).all()
+
+
+def test_adjust_cell_sizes_from_array_matches_objects():
+    objects = [Rectangle(name=str(i)) for i in range(4 * 3)]
+    objects[0].size = Size(2, 8)
+    objects[1].size = Size(4, 2)
+    objects[4].size = Size(2, 8)
+
+    def build_layout():
+        return Layout(Size(4, 3), Size(120, 100), padding=Padding(0.1, 0.05, 0.2, 0.15))
+
+    from_objects = build_layout()
+    from_objects.adjust_cell_sizes(objects)
+    from_array = build_layout()
+    from_array.adjust_cell_sizes_from_array(
+        ComposedObject(name="c", layout=build_layout(), objects=objects).child_sizes
+    )
+
+    assert from_array.widths.tobytes() == from_objects.widths.tobytes()
+    assert from_array.heights.tobytes() == from_objects.heights.tobytes()
+
+
+def test_refresh_redraws_changed_children_only():
+    nodes = [build_node(f"node{i}") for i in range(6)]
+    cluster = Cluster(
+        name="cluster", layout=Layout(Size(3, 2), Size(100, 100)), nodes=nodes
+    )
+
+    image, boxes = cluster.refresh()
+    assert boxes == [(0, 0, 100, 100)]
+    assert image.tobytes() == cluster.image.tobytes()
+
+    assert cluster.refresh() == (image, [])
+
+    nodes[4].gpus.objects[1].color = (0, 0, 255, 255)
+    refreshed, boxes = cluster.refresh()
+
+    assert refreshed is image
+    (x, y) = cluster.layout.get_position(4).tuple()
+    assert boxes == [(x, y, x + 30, y + 30)]
+    assert refreshed.tobytes() == cluster.image.tobytes()
+
+
+def test_refresh_clears_previous_extent():
+    obj = build_grid()
+    obj.refresh()
+
+    obj.objects[0].size = Size(2, 2)
+    image, boxes = obj.refresh()
+
+    (x, y) = obj.layout.get_position(0).tuple()
+    assert sorted(boxes) == [(x, y, x + 2, y + 2), (x, y, x + 5, y + 5)]
+    assert image.tobytes() == build_grid_with_first_size(Size(2, 2)).image.tobytes()
+
+
+def build_grid_with_first_size(size):
+    obj = build_grid()
+    obj.objects[0].size = size
+    return obj
+
+
+def test_refresh_after_layout_change_is_full():
+    obj = build_grid()
+    obj.refresh()
+
+    obj.size = Size(60, 60)
+    image, boxes = obj.refresh()
+
+    assert boxes == [(0, 0, 60, 60)]
+    assert image.tobytes() == obj.image.tobytes()
+
+
+def test_node_glyph():
+    node = build_node("node", color=(0, 0, 255, 255))
+    assert (0, 0, 255, 255) in dict(
+        (color, count) for count, color in node.image.getcolors()
+    )
+
+    node.size = Size(12, 12)
+    assert node.image.getcolors() == [(144, node.glyph_color)]
+
+    canvas = Canvas(Size(20, 20))
+    node.draw(canvas, Position(4, 4), canvas.box)
+    assert canvas.image.crop((4, 4, 16, 16)).getcolors() == [(144, node.glyph_color)]
+    assert canvas.image.getpixel((2, 2)) == (0, 0, 0, 0)
+
+
+def test_array_canvas_matches_pil(monkeypatch):
+    def render(canvas_type):
+        monkeypatch.setattr(architecture, "canvas_type", canvas_type)
+        instance_cache.clear()
+        nodes = [build_node(f"node{i}") for i in range(3)]
+        nodes.append(
+            BoundingBox(
+                name="box", object=build_node("boxed"), padding=Padding(4, 4, 4, 4)
+            )
+        )
+        cluster = Cluster(
+            name="cluster", layout=Layout(Size(2, 2), Size(80, 80)), nodes=nodes
+        )
+        canvas = canvas_type(Size(50, 30), origin=Position(20, 30))
+        cluster.draw(canvas, Position(), (25, 35, 60, 80))
+        return cluster.image.tobytes(), canvas.image.tobytes()
+
+    assert render(ArrayCanvas) == render(Canvas)
+
+
+def test_drawing_on_shared_image_matches_pil(monkeypatch):
+    def render(canvas_type):
+        monkeypatch.setattr(architecture, "canvas_type", canvas_type)
+        instance_cache.clear()
+        node = build_node("node")
+        # PIL copies the memory shared with the canvas before drawing
+        ImageDraw.Draw(node.image).rectangle((0, 0, 5, 5), fill=(0, 255, 0, 255))
+        box = BoundingBox(name="box", object=node, padding=Padding(4, 4, 4, 4))
+        return box.image
+
+    image = render(ArrayCanvas)
+    assert image.getpixel((6, 6)) == (0, 255, 0, 255)
+    assert image.tobytes() == render(Canvas).tobytes()
+
+
+def test_alpha_composite_matches_pil():
+    rng = np.random.default_rng(0)
+    (source, destination) = rng.integers(0, 256, (2, 16, 16, 4), dtype=np.uint8)
+    source[0] = 0
+
+    expected = Image.alpha_composite(
+        Image.fromarray(destination), Image.fromarray(source)
+    )
+    alpha_composite(destination, source)
+
+    assert destination.tobytes() == expected.tobytes()
@@ -1,10 +1,25 @@
 import io
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+import numpy as np
 import pytest
+from PIL import Image
 
-from cluster_map.architecture import ImageObject, Object, Size
+from cluster_map.architecture import (
+    RAM,
+    AssetLoader,
+    ImageCache,
+    ImageObject,
+    Object,
+    Size,
+    asset_cache,
+    get_asset,
+    get_glyph_color,
+    image_pixels,
+    open_image,
+)
 
 ROOT = Path(os.path.dirname(__file__))
 
@@ -36,3 +51,133 @@ def test_image_change_size_wrong_ratio():
 
     with pytest.raises(ValueError, match="Size ratio"):
         obj.size = Size(800, 318)
+
+
+def test_image_resize_is_shared():
+    first = ImageObject(name="first", image_path=ROOT / "v100_sxm.jpg")
+    second = ImageObject(name="second", image_path=ROOT / "v100_sxm.jpg")
+    first.size = Size(300, 159)
+    second.size = Size(300, 159)
+
+    image = first.image
+    hits = asset_cache.hits
+    assert second.image is image
+    assert asset_cache.hits == hits + 1
+
+
+def test_image_rotation_is_part_of_key():
+    obj = ImageObject(name="v100-sxm", image_path=ROOT / "v100_sxm.jpg")
+    rotated = obj.rotate(90)
+
+    assert rotated.size.tuple() == (636, 1200)
+    assert rotated.image is get_asset(ROOT / "v100_sxm.jpg", 90, (636, 1200))
+    assert rotated.image is not obj.image
+
+
+def test_image_cache_eviction():
+    cache = ImageCache(max_bytes=2 * 10 * 10 * 3)
+    images = {}
+
+    def create(key):
+        images[key] = Image.new("RGB", (10, 10))
+        return images[key]
+
+    for key in ["a", "b", "a", "c"]:
+        cache.get(key, lambda: create(key))
+
+    assert "a" in cache and "c" in cache and "b" not in cache
+    assert (cache.hits, cache.misses, cache.evictions) == (1, 3, 1)
+    assert cache.nbytes == 2 * 10 * 10 * 3
+
+    cache.max_bytes = 10 * 10 * 3
+    assert len(cache) == 1 and "c" in cache
+
+
+def test_packed_cache_counts_pasted_pixels():
+    cache = ImageCache(packed=True)
+    source = Image.new("RGB", (10, 10), (1, 2, 3))
+
+    image = cache.get("a", lambda: source)
+
+    # Array canvases paste the cached pixels, no converted copy is made
+    assert image.mode == "RGBA"
+    assert image.tobytes() == source.convert("RGBA").tobytes()
+    pixels = image_pixels(image)
+    pixels[0, 0] = 0
+    assert image.getpixel((0, 0)) == (0, 0, 0, 0)
+    assert cache.nbytes == 10 * 10 * 4
+
+
+def test_asset_loader_decodes_eagerly():
+    loader = AssetLoader()
+
+    image = loader.open(ROOT / "v100_sxm.jpg")
+
+    assert image.fp is None
+    assert loader.open(str(ROOT / "v100_sxm.jpg")) is image
+    stats = loader.stats[str(ROOT / "v100_sxm.jpg")]
+    assert stats.nbytes == 1200 * 636 * 3
+    assert stats.decode_time > 0
+
+
+def test_asset_loader_preload():
+    loader = AssetLoader()
+
+    stats = loader.preload(ROOT, workers=2)
+
+    assert list(stats) == [str(ROOT / "v100_sxm.jpg")]
+    assert loader.nbytes == 1200 * 636 * 3
+    assert loader.cache.misses == 1
+
+
+def test_asset_loader_concurrent_open():
+    loader = AssetLoader()
+
+    with ThreadPoolExecutor(8) as executor:
+        images = list(executor.map(loader.open, [ROOT / "v100_sxm.jpg"] * 32))
+
+    assert all(image is images[0] for image in images)
+    assert len(loader.cache) == 1
+
+
+def test_rotated_variants_are_shared():
+    rams = [RAM(name=f"ram{i}", image_path=ROOT / "v100_sxm.jpg") for i in range(4)]
+
+    assert all(ram._image is rams[0]._image for ram in rams)
+    assert rams[0].size.tuple() == (636, 1200)
+    source = open_image(ROOT / "v100_sxm.jpg")
+    expected = source.rotate(90, expand=True).convert("RGBA")
+    assert rams[0]._image.tobytes() == expected.tobytes()
+
+    rotated = [ram.rotate(90) for ram in rams]
+    assert rotated[0].rotation == 180
+    assert all(ram._image is rotated[0]._image for ram in rotated)
+    assert rotated[0]._image.tobytes() == source.rotate(180).convert("RGBA").tobytes()
+
+
+def test_level_of_detail():
+    obj = ImageObject(name="v100-sxm", image_path=ROOT / "v100_sxm.jpg")
+    full = get_asset(ROOT / "v100_sxm.jpg", 0, (100, 53))
+
+    obj.size = Size(100, 53)
+    thumbnail = np.asarray(obj.image, dtype=float)
+    assert obj.image is not full
+    assert np.abs(thumbnail - np.asarray(full, dtype=float)).mean() < 8
+
+    obj.size = Size(8, 4)
+    assert obj.image.getcolors() == [(32, get_glyph_color(ROOT / "v100_sxm.jpg"))]
+
+    obj.size = Size(300, 159)
+    assert obj.image is get_asset(ROOT / "v100_sxm.jpg", 0, (300, 159))
+
+
+def test_level_of_detail_opt_out():
+    obj = ImageObject(
+        name="v100-sxm",
+        image_path=ROOT / "v100_sxm.jpg",
+        glyph_size=0,
+        thumbnail_size=0,
+    )
+    obj.size = Size(8, 4)
+
+    assert obj.image is get_asset(ROOT / "v100_sxm.jpg", 0, (8, 4))
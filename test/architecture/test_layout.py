@@ -2,6 +2,8 @@ import functools
 import io
 import os
 
+import numpy as np
+import pytest
 from PIL import ImageDraw, ImageFont
 
 from cluster_map.architecture import (
@@ -202,3 +204,137 @@ class TestFlexibleColumnLayout:
         # Problem is most likely because of padding which is applied proportionally in base Layout
 
     # instead of directly.
+
+
+def reference_position(layout: Layout, index: int) -> tuple[int, int]:
+    # Position computed cell by cell
+    x_index = index % layout.grid.width
+    y_index = index // layout.grid.width
+
+    x = layout.widths[:, :x_index].max(0).sum() if x_index else 0
+    y = layout.heights[:y_index].max(1).sum() if y_index else 0
+
+    left = layout.padding.left * layout.size.width / layout.grid.width
+    right = layout.padding.right * layout.size.width / layout.grid.width
+    top = layout.padding.top * layout.size.height / layout.grid.height
+    bottom = layout.padding.bottom * layout.size.height / layout.grid.height
+
+    x += (left + right) * x_index
+    y += (top + bottom) * y_index
+
+    column_width = layout.widths[:, x_index].max()
+    row_height = layout.heights[y_index].max()
+    width = layout.widths[y_index, x_index]
+    height = layout.heights[y_index, x_index]
+
+    x += {
+        "left": left,
+        "center": (left + right + column_width) / 2 - width / 2,
+        "right": left + right + column_width - (right + width),
+    }[layout.halign]
+    y += {
+        "top": top,
+        "center": (top + bottom + row_height) / 2 - height / 2,
+        "bottom": top + bottom + row_height - (bottom + height),
+    }[layout.valign]
+
+    return (int(x), int(y))
+
+
+@pytest.mark.parametrize("valign", ["top", "center", "bottom"])
+@pytest.mark.parametrize("halign", ["left", "center", "right"])
+def test_get_positions(valign, halign):
+    layout = Layout(
+        Size(4, 3),
+        Size(120, 100),
+        padding=Padding(0.1, 0.05, 0.2, 0.15),
+        valign=valign,
+        halign=halign,
+    )
+
+    objects = [Rectangle(name=str(i), _size=Size(2, 2)) for i in range(4 * 3)]
+
+    objects[0].size = Size(2, 8)
+    objects[1].size = Size(4, 2)
+    objects[4].size = Size(2, 8)
+    objects[5].size = Size(2, 4)
+
+    layout.adjust_cell_sizes(objects)
+
+    positions = layout.get_positions()
+    assert positions.shape == (12, 2)
+    for i in range(4 * 3):
+        assert tuple(positions[i]) == reference_position(layout, i)
+        assert layout.get_position(i).tuple() == reference_position(layout, i)
+        assert layout.get_size(i).tuple() == tuple(layout.get_sizes()[i])
+
+
+def test_get_positions_is_cached():
+    layout = Layout(Size(2, 2), Size(20, 20))
+    objects = [Rectangle(name=str(i), _size=Size(2, 2)) for i in range(4)]
+    layout.adjust_cell_sizes(objects)
+
+    positions = layout.get_positions()
+    assert layout.get_positions() is positions
+
+    layout.size = Size(40, 40)
+    assert layout.get_positions() is not positions
+
+    positions = layout.get_positions()
+    layout.adjust_cell_sizes(objects)
+    assert layout.get_positions() is not positions
+
+
+class TestFlexibleColumnLayoutIndices:
+    def build_layout(self, valign="top", halign="left"):
+        layout = FlexibleColumnsLayout(
+            grid=Size(4, 3),
+            nrows=(3, 2, 1, 3),
+            padding=Padding(2, 2, 2, 2),
+            valign=valign,
+            halign=halign,
+        )
+        objects = [Rectangle(name=str(i), _size=Size(10 + i, 20)) for i in range(9)]
+        layout.adjust_cell_sizes(objects)
+        return layout
+
+    def test_indices(self):
+        layout = self.build_layout()
+
+        assert layout.indices.tolist() == [[0, 1, 2, 3], [4, 5, -1, 6], [7, -1, -1, 8]]
+        for i in range(9):
+            (y, x) = np.argwhere(layout.indices == i)[0]
+            assert layout.get_index(i).tuple() == (x, y)
+
+        with pytest.raises(IndexError):
+            layout.get_index(9)
+
+    @pytest.mark.parametrize("valign", ["top", "center", "bottom"])
+    @pytest.mark.parametrize("halign", ["left", "center", "right"])
+    def test_get_positions(self, valign, halign, capsys):
+        layout = self.build_layout(valign, halign)
+
+        positions = layout.get_positions()
+
+        assert positions.shape == (9, 2)
+        assert capsys.readouterr().out == ""
+        for i in range(9):
+            grid = layout.get_index(i)
+            x = layout.cell_widths[grid.y, : grid.x].sum()
+            y = layout.cell_heights[: grid.y, grid.x].sum()
+            width = layout.widths[grid.y, grid.x]
+            height = layout.heights[grid.y, grid.x]
+            cell_width = layout.cell_widths[grid.y, grid.x]
+            cell_height = layout.cell_heights[grid.y, grid.x]
+            x += {
+                "left": 2,
+                "center": cell_width / 2 - width / 2,
+                "right": cell_width - (2 + width),
+            }[halign]
+            y += {
+                "top": 2,
+                "center": cell_height / 2 - height / 2,
+                "bottom": cell_height - (2 + height),
+            }[valign]
+            assert tuple(positions[i]) == (int(x), int(y))
+            assert layout.get_position(i).tuple() == (int(x), int(y))
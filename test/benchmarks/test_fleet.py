@@ -0,0 +1,61 @@
+import json
+
+from benchmarks.fleet import CEDAR, synthetic_fleet
+from benchmarks.run import main
+from cluster_map.architecture import Size
+from cluster_map.nodes import build_cluster
+
+
+def test_cedar_shape():
+    assert CEDAR.n_nodes == 338
+
+    cluster = build_cluster(CEDAR)
+
+    assert len(cluster.nodes) == 338
+    assert cluster.layout.grid == Size(19, 18)
+    assert len(cluster.nodes[0].ram.objects) == 4
+    assert len(cluster.nodes[-1].ram.objects) == 6
+    # Same RAM columns as the original hand-written cedar nodes
+    assert cluster.nodes[0].ram.layout.size == Size(100, 800)
+    assert cluster.nodes[114].ram.layout.size == Size(300, 800)
+    assert cluster.nodes[-1].ram.layout.size == Size(100, 1000)
+
+
+def test_synthetic_fleet():
+    fleet = synthetic_fleet(10, gpus=8, dimms=16, assets=("p100.jpg", "v100.jpg"))
+
+    assert [shape.count for shape in fleet.nodes] == [5, 5]
+    assert fleet.n_components == 10 * (8 + 2 + 16)
+
+    cluster = build_cluster(fleet)
+    assert cluster.layout.grid == Size(4, 3)
+    assert cluster.nodes[0].ram.layout.grid == Size(2, 8)
+
+
+def test_benchmark_report(tmp_path):
+    main(
+        [
+            "--fleets",
+            "synthetic-4",
+            "--size",
+            "200",
+            "--repeat",
+            "2",
+            "--output",
+            str(tmp_path / "results.json"),
+        ]
+    )
+
+    with open(tmp_path / "results.json", encoding="utf-8") as file:
+        report = json.load(file)
+
+    (result,) = report["benchmarks"]
+    assert result["nodes"] == 4
+    assert result["size"] == [200, 200]
+    assert set(result["results"]) == {
+        "construction",
+        "adjust_cell_sizes",
+        "render",
+        "encode",
+    }
+    assert len(result["results"]["render"]["timings"]) == 2
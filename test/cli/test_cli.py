@@ -0,0 +1,152 @@
+import json
+
+import pytest
+from PIL import Image
+
+from cluster_map import spec
+from cluster_map.architecture import Size
+from cluster_map.cli import main, parse_size
+
+
+def write_spec(path, name, size=None):
+    spec = {
+        "name": name,
+        "grid": [2, 2],
+        "nodes": [{"count": 3, "gpu": "v100.jpg"}, {"count": 1, "gpu": "p100.jpg"}],
+    }
+    if size is not None:
+        spec["size"] = size
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(spec, file)
+    return str(path)
+
+
+def test_render_batch(tmp_path):
+    specs = [
+        write_spec(tmp_path / "first.json", "first"),
+        write_spec(tmp_path / "second.json", "second"),
+    ]
+    main(
+        [
+            "render",
+            *specs,
+            "--sizes",
+            "200",
+            "300",
+            "--output_dir",
+            str(tmp_path / "maps"),
+            "--timings",
+            str(tmp_path / "timings.json"),
+        ]
+    )
+
+    with open(tmp_path / "timings.json", encoding="utf-8") as file:
+        summary = json.load(file)
+
+    renders = summary["renders"]
+    assert [(render["cluster"], render["size"]) for render in renders] == [
+        ("first", [200, 200]),
+        ("first", [300, 300]),
+        ("second", [200, 200]),
+        ("second", [300, 300]),
+    ]
+    for render in renders:
+        assert Image.open(render["output"]).size == tuple(render["size"])
+        assert render["build"] > 0 and render["render"] > 0
+
+    # The second cluster has the same nodes, their rasters are reused
+    assert renders[2]["cache"]["instances"]["misses"] == 0
+    assert renders[2]["cache"]["instances"]["hits"] > 0
+    assert renders[2]["cache"]["assets"]["misses"] == 0
+
+
+def test_render_jobs(tmp_path, capsys):
+    spec = write_spec(tmp_path / "spec.json", "cluster")
+    main(
+        [
+            "render",
+            spec,
+            "--sizes",
+            "100",
+            "150",
+            "--jobs",
+            "2",
+            "--output_dir",
+            str(tmp_path),
+        ]
+    )
+
+    summary = json.loads(capsys.readouterr().out)
+    assert summary["jobs"] == 2
+    assert sorted(path.name for path in tmp_path.glob("*.png")) == [
+        "cluster-100x100.png",
+        "cluster-150x150.png",
+    ]
+
+
+def test_parse_size():
+    assert parse_size("300x200") == Size(300, 200)
+    assert parse_size("300") == Size(300, 300)
+
+    with pytest.raises(ValueError, match="Invalid size"):
+        parse_size("300x")
+
+
+def test_render_sizes(tmp_path):
+    path = write_spec(tmp_path / "spec.json", "cluster", size=[160, 120])
+    main(["render", path, "--output_dir", str(tmp_path)])
+    main(["render", path, "--sizes", "300x200", "--output_dir", str(tmp_path)])
+
+    with Image.open(tmp_path / "cluster-160x120.png") as image:
+        assert image.size == (160, 120)
+    with Image.open(tmp_path / "cluster-300x200.png") as image:
+        assert image.size == (300, 200)
+
+
+def test_render_pyramid(tmp_path, capsys, monkeypatch):
+    path = write_spec(tmp_path / "spec.json", "cluster")
+    argv = [
+        "render",
+        path,
+        "--sizes",
+        "300",
+        "--pyramid",
+        "--output_dir",
+        str(tmp_path),
+        "--cache_dir",
+        str(tmp_path / "cache"),
+    ]
+    main(argv)
+
+    (render,) = json.loads(capsys.readouterr().out)["renders"]
+    assert render["output"].endswith("cluster-300x300.dzi")
+    assert (tmp_path / "cluster-300x300_files" / "9" / "1_1.png").exists()
+
+    # The scene compiled for the first render is reused
+    def fail(fleet):
+        raise AssertionError("The cluster was built again")
+
+    monkeypatch.setattr(spec, "build_cluster", fail)
+    main(argv)
+    assert len(list((tmp_path / "cache").iterdir())) == 1
+
+
+def test_render_scratch_dir(tmp_path):
+    spec = write_spec(tmp_path / "spec.json", "cluster")
+    main(
+        [
+            "render",
+            spec,
+            "--sizes",
+            "120",
+            "--scratch_dir",
+            str(tmp_path),
+            "--output_dir",
+            str(tmp_path / "maps"),
+            "--timings",
+            str(tmp_path / "timings.json"),
+        ]
+    )
+
+    with Image.open(tmp_path / "maps" / "cluster-120x120.png") as image:
+        assert image.size == (120, 120)
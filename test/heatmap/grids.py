@@ -0,0 +1,32 @@
+from cluster_map.architecture import (
+    BoundingBox,
+    ComposedObject,
+    Layout,
+    Padding,
+    Rectangle,
+    Size,
+)
+
+
+def build_grid(boxed=False):
+    # 2x2 white components, the last one in a bounding box if `boxed`
+    objects = [
+        Rectangle(name=f"rect{i}", color=(255, 255, 255, 255), _size=Size(10, 10))
+        for i in range(3 if boxed else 4)
+    ]
+    if boxed:
+        objects.append(
+            BoundingBox(
+                name="box",
+                object=Rectangle(
+                    name="inner", color=(255, 255, 255, 255), _size=Size(6, 6)
+                ),
+                padding=Padding(2, 2, 2, 2),
+                width=1,
+            )
+        )
+    return ComposedObject(
+        name="grid",
+        layout=Layout(Size(2, 2), Size(40, 40), padding=Padding(0, 0, 0, 0)),
+        objects=objects,
+    )
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from cluster_map.heatmap import Heatmap, apply_colormap, component_boxes
+
+from heatmap.grids import build_grid
+
+
+def test_apply_colormap():
+    colormap = np.array([(0, 0, 0, 255), (255, 255, 255, 255)], dtype=np.uint8)
+
+    colors = apply_colormap([0, 0.5, 2, np.nan], colormap)
+
+    assert colors.tolist() == [
+        [0, 0, 0, 255],
+        [128, 128, 128, 255],
+        [255, 255, 255, 255],
+        [0, 0, 0, 0],
+    ]
+
+
+def test_component_boxes():
+    grid = build_grid(boxed=True)
+    boxes = component_boxes(grid)
+
+    assert boxes.tolist() == [
+        [0, 0, 10, 10],
+        [20, 0, 30, 10],
+        [0, 20, 10, 30],
+        [22, 22, 28, 28],
+    ]
+    assert component_boxes(grid, scale=0.5)[1].tolist() == [10, 0, 15, 5]
+
+
+def test_heatmap_tints_components():
+    obj = build_grid(boxed=True)
+    colormap = np.array([(255, 0, 0, 255), (0, 0, 255, 255)], dtype=np.uint8)
+    heatmap = Heatmap(obj, alpha=1, colormap=colormap)
+
+    image = np.asarray(heatmap.render(np.array([0, 1, np.nan, 0])))
+
+    assert image[5, 5].tolist() == [255, 0, 0, 255]
+    assert image[5, 25].tolist() == [0, 0, 255, 255]
+    # Missing values and pixels outside of the components are left untouched
+    base = np.asarray(obj.image)
+    assert (image[20:30, 0:10] == base[20:30, 0:10]).all()
+    assert (image[15, :] == base[15, :]).all()
+    assert image[25, 25].tolist() == [255, 0, 0, 255]
+
+
+def test_heatmap_refresh():
+    heatmap = Heatmap(build_grid(boxed=True), alpha=0.5)
+
+    first = np.asarray(heatmap.render(np.zeros(4)))
+    second = np.asarray(heatmap.render(np.ones(4)))
+
+    assert (first[5, 5] != second[5, 5]).any()
+    assert (first[15, 15] == second[15, 15]).all()
+
+    with pytest.raises(ValueError, match="Expected 4 values"):
+        heatmap.render(np.ones(3))
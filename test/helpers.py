@@ -0,0 +1,65 @@
+import os
+from pathlib import Path
+
+from cluster_map.architecture import (
+    GPU,
+    RAM,
+    ComposedObject,
+    Layout,
+    Node,
+    Rectangle,
+    Size,
+)
+
+IMAGE_PATH = Path(os.path.dirname(__file__)) / "architecture" / "v100_sxm.jpg"
+
+
+def build_node(name, color=(255, 0, 0, 255), scale=1, gpus=4):
+    # Node of rectangles, 30 times `scale` pixels wide and high
+    def build_part(part, n):
+        objects = [
+            Rectangle(name=f"{part}{i}", color=color, _size=Size(4 * scale, 8 * scale))
+            for i in range(n)
+        ]
+        return ComposedObject(
+            name=f"{name}-{part}",
+            layout=Layout(Size(1, n), Size(10 * scale, 30 * scale)),
+            objects=objects,
+        )
+
+    return Node(
+        name=name,
+        layout=Layout(Size(3, 1), Size(30 * scale, 30 * scale)),
+        gpus=build_part("gpu", gpus),
+        cpus=build_part("cpu", 2),
+        ram=build_part("ram", 3),
+    )
+
+
+def build_image_node(name, scale=1, gpu_padding=None):
+    # Node of assets, 120 times `scale` pixels wide and 80 high
+    gpus = ComposedObject(
+        name=f"{name}-gpus",
+        layout=Layout(Size(1, 2), Size(60 * scale, 80 * scale), padding=gpu_padding),
+        objects=[GPU(name=f"gpu{i}", image_path=IMAGE_PATH) for i in range(2)],
+    )
+    cpus = ComposedObject(
+        name=f"{name}-cpus",
+        layout=Layout(Size(1, 2), Size(20 * scale, 80 * scale)),
+        objects=[
+            Rectangle(name=f"cpu{i}", _size=Size(10 * scale, 10 * scale))
+            for i in range(2)
+        ],
+    )
+    ram = ComposedObject(
+        name=f"{name}-ram",
+        layout=Layout(Size(2, 2), Size(30 * scale, 80 * scale)),
+        objects=[RAM(name=f"ram{i}", image_path=IMAGE_PATH) for i in range(4)],
+    )
+    return Node(
+        name=name,
+        layout=Layout(Size(3, 1), Size(120 * scale, 80 * scale)),
+        gpus=gpus,
+        cpus=cpus,
+        ram=ram,
+    )
@@ -0,0 +1,69 @@
+from cluster_map import architecture
+from cluster_map.architecture import (
+    BoundingBox,
+    ComposedObject,
+    Layout,
+    Padding,
+    Rectangle,
+    Size,
+)
+from cluster_map.instrument import profile_rendering
+
+
+def build_boxes():
+    boxes = []
+    for i in range(4):
+        objects = [Rectangle(name=f"rect{i}-{j}", _size=Size(10, 10)) for j in range(4)]
+        boxes.append(
+            BoundingBox(
+                name=f"box{i}",
+                object=ComposedObject(
+                    name=f"composed{i}",
+                    layout=Layout(Size(2, 2), Size(40, 40)),
+                    objects=objects,
+                ),
+                padding=Padding(5, 5, 5, 5),
+                width=2,
+            )
+        )
+    return ComposedObject(
+        name="boxes", layout=Layout(Size(2, 2), Size(120, 120)), objects=boxes
+    )
+
+
+def test_profile_rendering():
+    obj = build_boxes()
+    expected = build_boxes().image.tobytes()
+
+    with profile_rendering() as profile:
+        assert obj.image.tobytes() == expected
+
+    assert architecture.render_observer is None
+
+    # Boxes and their contents are drawn in place of the image of the root
+    composed = profile.by_class["ComposedObject.render"]
+    assert composed.calls == 1
+    assert composed.pixels == 120 * 120
+    assert composed.nbytes == 4 * composed.pixels
+    assert profile.by_class["BoundingBox.draw"].calls == 4
+    assert profile.by_class["ComposedObject.draw"].calls == 4
+    assert profile.by_class["Rectangle.draw"].calls == 16
+    assert profile.by_class["Rectangle.draw"].pixels == 16 * 10 * 10
+    assert profile.by_name["rect0-0"].calls == 1
+
+    stats = profile.by_class["ComposedObject.render"]
+    assert stats.time <= stats.total_time
+    assert [key for key, _ in profile.top(n=2)] == [
+        key for key, _ in profile.top(n=10)[:2]
+    ]
+    assert "BoundingBox.draw" in profile.report()
+
+
+def test_cached_images_are_not_reported():
+    obj = build_boxes()
+    obj.image
+
+    with profile_rendering() as profile:
+        obj.image
+
+    assert not profile.by_class
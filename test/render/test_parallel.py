@@ -0,0 +1,74 @@
+from cluster_map.architecture import (
+    BoundingBox,
+    ComposedObject,
+    Layout,
+    Padding,
+    Size,
+    image_nbytes,
+    instance_cache,
+)
+from cluster_map.render import render_parallel
+
+from helpers import build_node
+
+
+def build_cluster(instanced):
+    colors = [(255, 0, 0, 255), (0, 0, 255, 255)]
+    nodes = [
+        BoundingBox(
+            name=f"node{i}",
+            object=build_node(f"node{i}", colors[i % 2]),
+            padding=Padding(5, 5, 5, 5),
+            width=2,
+        )
+        for i in range(9)
+    ]
+    return ComposedObject(
+        name="cluster",
+        layout=Layout(Size(3, 3), Size(150, 150)),
+        objects=nodes,
+        instanced=instanced,
+    )
+
+
+def test_parallel_nodes():
+    obj = build_cluster(instanced=False)
+
+    assert render_parallel(obj, jobs=2).tobytes() == obj.image.tobytes()
+
+
+def test_parallel_instanced_nodes():
+    instance_cache.clear()
+    obj = build_cluster(instanced=True)
+    misses = instance_cache.misses
+
+    image = render_parallel(obj, jobs=2)
+
+    assert instance_cache.misses == misses + 2
+    assert image.tobytes() == build_cluster(instanced=False).image.tobytes()
+
+
+def test_parallel_instanced_nodes_after_eviction():
+    instance_cache.clear()
+    obj = build_cluster(instanced=True)
+    expected = build_cluster(instanced=False).image.tobytes()
+
+    # The cached body is evicted by the one rendered by the workers
+    body = instance_cache.get(obj.objects[0].structure_key, obj.objects[0].render_body)
+    (max_bytes, evictions) = (instance_cache.max_bytes, instance_cache.evictions)
+    instance_cache.max_bytes = image_nbytes(body)
+    try:
+        image = render_parallel(obj, jobs=2)
+    finally:
+        instance_cache.max_bytes = max_bytes
+
+    assert instance_cache.evictions > evictions
+    assert image.tobytes() == expected
+
+
+def test_parallel_tiles():
+    obj = build_cluster(instanced=True)
+
+    image = render_parallel(obj, jobs=2, tile_size=Size(64, 64))
+
+    assert image.tobytes() == obj.image.tobytes()
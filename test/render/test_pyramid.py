@@ -0,0 +1,70 @@
+import xml.etree.ElementTree as ElementTree
+
+from PIL import Image
+
+from cluster_map.architecture import ComposedObject, Layout, Size
+from cluster_map.pyramid import level_count, level_size, save_pyramid
+from cluster_map.scene import compile_scene
+
+from helpers import build_node
+
+
+def build_cluster():
+    colors = [(255, 0, 0, 255), (0, 0, 255, 255)]
+    return ComposedObject(
+        name="cluster",
+        layout=Layout(Size(4, 2), Size(600, 300)),
+        objects=[
+            build_node(f"node{i}", colors[i % 2], scale=5, gpus=3) for i in range(8)
+        ],
+    )
+
+
+def test_levels():
+    assert level_count(Size(600, 300)) == 11
+    assert level_size(Size(600, 300), 10, 11) == Size(600, 300)
+    assert level_size(Size(600, 300), 9, 11) == Size(300, 150)
+    assert level_size(Size(600, 300), 0, 11) == Size(1, 1)
+
+
+def test_save_pyramid(tmp_path):
+    obj = build_cluster()
+    scene = compile_scene(obj)
+
+    tiles = save_pyramid(obj, tmp_path / "cluster.dzi", tile_size=256)
+
+    descriptor = ElementTree.parse(tmp_path / "cluster.dzi").getroot()
+    assert descriptor.get("TileSize") == "256"
+    assert descriptor[0].get("Width") == "600"
+    assert descriptor[0].get("Height") == "300"
+
+    files = tmp_path / "cluster_files"
+    assert sorted(int(level.name) for level in files.iterdir()) == list(range(11))
+    # 3x2 tiles at full size, 2x1 at half size and one for each smaller level
+    assert tiles == 6 + 2 + 9
+    assert len(list((files / "10").iterdir())) == 6
+
+    assert (
+        Image.open(files / "10" / "2_1.png").tobytes()
+        == scene.render((512, 256, 600, 300)).tobytes()
+    )
+    # Smaller levels are rendered at their own scale
+    assert (
+        Image.open(files / "9" / "0_0.png").tobytes()
+        == scene.render((0, 0, 256, 150), scale=0.5).tobytes()
+    )
+    assert Image.open(files / "0" / "0_0.png").size == (1, 1)
+
+
+def test_save_pyramid_parallel(tmp_path):
+    obj = build_cluster()
+    save_pyramid(obj, tmp_path / "serial.dzi", tile_size=128)
+    save_pyramid(obj, tmp_path / "parallel.dzi", tile_size=128, jobs=2)
+
+    serial = sorted((tmp_path / "serial_files").rglob("*.png"))
+    parallel = sorted((tmp_path / "parallel_files").rglob("*.png"))
+    assert [path.relative_to(tmp_path / "serial_files") for path in serial] == [
+        path.relative_to(tmp_path / "parallel_files") for path in parallel
+    ]
+    for first, second in zip(serial, parallel):
+        assert Image.open(first).tobytes() == Image.open(second).tobytes()
@@ -0,0 +1,118 @@
+import numpy as np
+from PIL import Image
+
+from cluster_map.architecture import (
+    BoundingBox,
+    ComposedObject,
+    Layout,
+    Padding,
+    Position,
+    Rectangle,
+    Size,
+)
+from cluster_map.render import (
+    MappedCanvas,
+    render_region,
+    render_tiles,
+    save_mapped,
+    save_tiled,
+)
+
+
+class CountingRectangle(Rectangle):
+    draws = 0
+
+    def draw(self, canvas, position, clip):
+        CountingRectangle.draws += 1
+        super().draw(canvas, position, clip)
+
+
+def build_cluster():
+    def build_box(i):
+        objects = [CountingRectangle(name=str(j)) for j in range(4)]
+        for obj in objects:
+            obj.size = Size(10, 10)
+        return BoundingBox(
+            name=f"box{i}",
+            object=ComposedObject(
+                name=f"composed{i}",
+                layout=Layout(Size(2, 2), Size(40, 40)),
+                objects=objects,
+            ),
+            padding=Padding(5, 5, 5, 5),
+            width=2,
+        )
+
+    return ComposedObject(
+        name="cluster",
+        layout=Layout(Size(4, 4), Size(250, 250), valign="center"),
+        objects=[build_box(i) for i in range(4 * 3)]
+        + [CountingRectangle(name="extra", _size=Size(300, 10))],
+    )
+
+
+def test_tiles_match_full_image():
+    obj = build_cluster()
+    stitched = Image.new("RGBA", obj.size.tuple())
+    for box, tile in render_tiles(obj, Size(64, 50)):
+        assert tile.size == (box[2] - box[0], box[3] - box[1])
+        stitched.paste(tile, box[:2])
+
+    assert stitched.tobytes() == obj.image.tobytes()
+
+
+def test_region_culls_objects_outside():
+    obj = build_cluster()
+    CountingRectangle.draws = 0
+
+    render_region(obj, (0, 0, 60, 60))
+
+    # Only the rectangles of the first box are drawn
+    assert CountingRectangle.draws == 4
+
+    # Boxes are culled in place too, their corner holds no rectangle
+    CountingRectangle.draws = 0
+    render_region(obj, (0, 0, 10, 10))
+    assert CountingRectangle.draws == 0
+
+
+def test_region_does_not_memoize_boxes():
+    obj = build_cluster()
+
+    tiles = dict(render_tiles(obj, Size(64, 50)))
+
+    # Boxes are drawn in place, only the tiles are kept in memory
+    assert all(box._cached_image is None for box in obj.objects[:-1])
+    assert all(box.object._cached_image is None for box in obj.objects[:-1])
+    assert tiles[(0, 0, 64, 50)].tobytes() == obj.image.crop((0, 0, 64, 50)).tobytes()
+
+
+def test_save_tiled_png(tmp_path):
+    obj = build_cluster()
+
+    save_tiled(obj, tmp_path / "cluster.png", Size(100, 64))
+
+    with Image.open(tmp_path / "cluster.png") as image:
+        assert image.size == obj.size.tuple()
+        assert image.tobytes() == obj.image.tobytes()
+
+
+def test_save_mapped_png(tmp_path):
+    obj = build_cluster()
+
+    save_mapped(obj, tmp_path / "cluster.png", Size(100, 64), scratch_dir=tmp_path)
+
+    with Image.open(tmp_path / "cluster.png") as image:
+        assert image.tobytes() == obj.image.tobytes()
+
+
+def test_mapped_canvas(tmp_path):
+    with MappedCanvas(Size(30, 20), (1, 2, 3), Position(10, 0), tmp_path) as canvas:
+        assert isinstance(canvas.pixels, np.memmap)
+        canvas.fill((0, 10, 20, 20), (255, 0, 0, 255))
+
+        bands = list(canvas.iter_bands(8))
+        assert [band.shape for band in bands] == [(8, 30, 4), (8, 30, 4), (4, 30, 4)]
+        assert tuple(bands[0][0, 0]) == (1, 2, 3, 255)
+        assert tuple(bands[2][-1, 0]) == (255, 0, 0, 255)
+        assert tuple(bands[2][-1, 10]) == (1, 2, 3, 255)
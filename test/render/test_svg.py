@@ -0,0 +1,80 @@
+import xml.etree.ElementTree as ElementTree
+
+from cluster_map.architecture import BoundingBox, Cluster, Layout, Padding, Size
+from cluster_map.svg import save_svg
+
+from helpers import IMAGE_PATH, build_image_node
+
+SVG = "{http://www.w3.org/2000/svg}"
+HREF = "{http://www.w3.org/1999/xlink}href"
+
+
+def build_cluster(instanced):
+    nodes = [build_image_node(f"node{i}", scale=10) for i in range(3)]
+    nodes.append(
+        BoundingBox(
+            name="boxed <node>",
+            object=build_image_node("boxed", scale=10),
+            padding=Padding(50, 50, 50, 50),
+            width=10,
+        )
+    )
+    return Cluster(
+        name="cluster",
+        layout=Layout(Size(2, 2), Size(3000, 2000)),
+        nodes=nodes,
+        instanced=instanced,
+    )
+
+
+def parse(path):
+    return ElementTree.parse(path).getroot()
+
+
+def test_svg_assets_are_shared(tmp_path):
+    save_svg(build_cluster(instanced=False), tmp_path / "cluster.svg")
+    root = parse(tmp_path / "cluster.svg")
+
+    assert root.get("width") == "3000"
+    symbols = root.findall(f".//{SVG}symbol")
+    # The GPU asset and its rotated variant for the RAM
+    assert len(symbols) == 2
+    assert all(
+        symbol.find(f"{SVG}image").get(HREF).startswith("data:image/jpeg")
+        for symbol in symbols
+    )
+    assert symbols[1].find(f"{SVG}image").get("transform") is not None
+    assert len(root.findall(f".//{SVG}use")) == 4 * 6
+    assert len(root.findall(f".//{SVG}rect[@rx]")) == 1
+
+
+def test_svg_bounding_box(tmp_path):
+    save_svg(build_cluster(instanced=False), tmp_path / "cluster.svg")
+    root = parse(tmp_path / "cluster.svg")
+
+    (rect,) = root.findall(f".//{SVG}rect[@rx]")
+    assert rect.get("stroke-width") == "10"
+    assert rect.get("x") == "5"
+    (text,) = root.findall(f".//{SVG}text")
+    assert text.text == "boxed <node>"
+
+
+def test_svg_instanced_bodies(tmp_path):
+    save_svg(build_cluster(instanced=True), tmp_path / "cluster.svg")
+    root = parse(tmp_path / "cluster.svg")
+
+    # Identical nodes share one body, the bounding box has its own
+    symbols = root.findall(f".//{SVG}symbol")
+    assert len(symbols) == 2 + 2
+    cluster = root.find(f"{SVG}svg")
+    assert len(cluster.findall(f"{SVG}use")) == 4
+    # Labels are drawn per instance
+    assert len(cluster.findall(f"{SVG}text")) == 1
+
+
+def test_svg_linked_assets(tmp_path):
+    save_svg(build_image_node("node", scale=10), tmp_path / "node.svg", embed=False)
+    root = parse(tmp_path / "node.svg")
+
+    images = root.findall(f".//{SVG}image")
+    assert [image.get(HREF) for image in images] == [str(IMAGE_PATH)] * 2
@@ -0,0 +1,99 @@
+import pytest
+
+from cluster_map.architecture import (
+    BoundingBox,
+    Cluster,
+    Layout,
+    Padding,
+    Size,
+)
+from cluster_map.render import render_region
+from cluster_map.scene import FILL, IMAGE, RASTER, RECTANGLE, Scene, compile_scene
+
+from helpers import build_image_node
+
+
+def build_cluster():
+    padding = Padding(0.05, 0.05, 0.05, 0.05)
+    nodes = [build_image_node(f"node{i}", gpu_padding=padding) for i in range(5)]
+    nodes.append(
+        BoundingBox(
+            name="box",
+            object=build_image_node("boxed", gpu_padding=padding),
+            padding=Padding(5, 5, 5, 5),
+            width=2,
+        )
+    )
+    return Cluster(
+        name="cluster",
+        layout=Layout(Size(3, 2), Size(400, 200), valign="center"),
+        nodes=nodes,
+    )
+
+
+def test_scene_arrays():
+    scene = compile_scene(build_cluster())
+
+    # Cluster, 5 nodes with 3 groups and 8 components each and a bounding box
+    assert len(scene) == 1 + 5 * (1 + 3 + 8) + 1
+    assert scene.parent[0] == -1
+    assert (scene.kind == FILL).sum() == 1 + 5 * 4
+    assert (scene.kind == IMAGE).sum() == 5 * 6
+    assert (scene.kind == RECTANGLE).sum() == 5 * 2
+    assert (scene.kind == RASTER).sum() == 1
+    # GPUs and RAM share their image, plus two colors and the bounding box raster
+    assert len(scene.assets) == 4
+    assert scene.nbytes < 100 * len(scene)
+
+
+def test_scene_render_matches_objects():
+    obj = build_cluster()
+    scene = compile_scene(obj)
+
+    assert scene.render().tobytes() == obj.image.tobytes()
+
+
+@pytest.mark.parametrize("box", [(0, 0, 50, 50), (130, 40, 330, 170)])
+def test_scene_render_region(box):
+    obj = build_cluster()
+    scene = compile_scene(obj)
+
+    assert scene.render(box).tobytes() == render_region(obj, box).tobytes()
+
+
+def test_scene_save_load(tmp_path):
+    scene = compile_scene(build_cluster())
+    scene.save(tmp_path / "scene.npz")
+
+    loaded = Scene.load(tmp_path / "scene.npz")
+
+    assert loaded.size == scene.size
+    assert (loaded.clip == scene.clip).all()
+    assert loaded.assets[:3] == scene.assets[:3]
+    assert loaded.render().tobytes() == scene.render().tobytes()
+
+
+def test_scene_render_scaled():
+    scene = compile_scene(build_cluster())
+
+    image = scene.render(scale=0.5)
+    assert image.size == (200, 100)
+    assert scene.render((50, 20, 150, 80), scale=0.5).tobytes() == (
+        image.crop((50, 20, 150, 80)).tobytes()
+    )
+
+
+def test_scene_node_glyphs():
+    obj = build_cluster()
+    scene = compile_scene(obj)
+    glyph_color = obj.nodes[0].glyph_color
+
+    # Nodes are 120x80, 12x8 once scaled
+    image = scene.render(scale=0.1)
+    (x, y) = (scene.boxes[1, :2] * 0.1).round().astype(int).tolist()
+    assert image.crop((x, y, x + 12, y + 8)).getcolors() == [(96, glyph_color)]
+
+    # Nodes keep their components at larger scales
+    image = scene.render(scale=0.5)
+    (x, y) = (scene.boxes[1, :2] * 0.5).round().astype(int).tolist()
+    assert len(image.crop((x, y, x + 60, y + 40)).getcolors(60 * 40)) > 1
@@ -0,0 +1,133 @@
+import os
+
+from cluster_map.architecture import Size
+from cluster_map.slurm import (
+    STATE_COLORS,
+    NodeRecord,
+    build_nodes,
+    expand_records,
+    load_cluster,
+    parse_gpus,
+    read_records,
+    state_color,
+)
+
+FIXTURES = os.path.dirname(__file__)
+
+
+def fixture(name: str) -> str:
+    return os.path.join(FIXTURES, name)
+
+
+def test_parse_gpus():
+    assert parse_gpus("gpu:p100:4(S:0-1)") == ("p100.jpg", 4)
+    assert parse_gpus("gpu:a100:2,gpu:a100:2") == ("a100_sxm.jpg", 4)
+    assert parse_gpus("mps:100,gpu:4") == ("v100.jpg", 4)
+    assert parse_gpus("") == ("v100.jpg", 0)
+
+
+def test_read_scontrol():
+    records = list(read_records(fixture("scontrol.txt")))
+
+    assert [record.name for record in records] == ["cdr26", "cdr27", "cdr28"]
+    assert records[1] == NodeRecord(
+        name="cdr27",
+        state="allocated",
+        sockets=2,
+        memory=257000,
+        gres="gpu:p100l:4(S:0-1)",
+    )
+    assert records[2].state == "idle+drain"
+    assert records[2].gres == ""
+
+
+def test_read_sinfo():
+    records = list(read_records(fixture("sinfo.txt")))
+
+    assert len(records) == 4
+    assert records[0].name == "cdr[26-139]"
+    assert records[3].state == "drained"
+
+    hosts = [host for host, _ in expand_records(records)]
+    # cdr[26-30] is listed twice
+    assert len(hosts) == 114 + 32 + 2
+    assert hosts[:2] == ["cdr26", "cdr27"]
+    assert hosts[-1] == "blg8002"
+
+
+def test_read_json():
+    records = list(read_records(fixture("nodes.jsonl")))
+
+    assert [record.name for record in records] == ["ng[10101-10104]", "bc[11001-11002]"]
+    assert records[0].shape.dimms == 16
+    assert records[0].shape.dimm_columns == 2
+
+
+def test_load_cluster():
+    cluster = load_cluster(fixture("sinfo.txt"), "cedar", grid=Size(12, 13))
+
+    assert len(cluster.nodes) == 148
+    assert cluster.nodes[0].name == "cdr26"
+    assert len(cluster.nodes[0].gpus.objects) == 4
+    assert len(cluster.nodes[0].ram.objects) == 4
+    assert len(cluster.nodes[114].ram.objects) == 8
+    assert len(cluster.nodes[-1].gpus.objects) == 0
+
+    # Nodes of the same shape are independent copies with the same structure
+    assert cluster.nodes[1].gpus is not cluster.nodes[0].gpus
+    assert cluster.nodes[1].gpus.objects[0] is not cluster.nodes[0].gpus.objects[0]
+    assert cluster.nodes[1].layout is not cluster.nodes[0].layout
+    assert cluster.nodes[1].structure_key == cluster.nodes[0].structure_key
+    assert cluster.nodes[114].ram is not cluster.nodes[0].ram
+
+
+def test_ten_thousand_nodes(tmp_path):
+    path = tmp_path / "sinfo.txt"
+    with open(path, "w", encoding="utf-8") as file:
+        file.write("NODELIST SOCKETS MEMORY GRES STATE\n")
+        for i in range(100):
+            memory = 128000 * (1 + i % 2)
+            file.write(f"n{i}x[1-100] 2 {memory} gpu:v100:4 idle\n")
+
+    # Build times are measured by the construction benchmark of benchmarks.run
+    cluster = load_cluster(path, "large")
+
+    assert len(cluster.nodes) == 10000
+    assert cluster.layout.grid == Size(100, 100)
+    assert cluster.nodes[-1].name == "n99x100"
+    assert cluster.nodes[0].ram is not cluster.nodes[2].ram
+    assert cluster.nodes[0].ram.structure_key == cluster.nodes[2].ram.structure_key
+
+
+def test_build_nodes_streams():
+    nodes = build_nodes(
+        NodeRecord(name=f"cdr[{i * 10}-{i * 10 + 9}]", memory=128000)
+        for i in range(1000000)
+    )
+
+    assert [next(nodes).name for _ in range(3)] == ["cdr0", "cdr1", "cdr2"]
+
+
+def test_state_color():
+    assert state_color("idle") is None
+    assert state_color("mixed") is None
+    assert state_color("down*") == STATE_COLORS["down"]
+    assert state_color("idle+drain") == STATE_COLORS["drain"]
+    assert state_color("drained*+maint") == STATE_COLORS["drain"]
+
+
+def test_build_nodes_colors_states():
+    nodes = list(
+        build_nodes(
+            [
+                NodeRecord(name="cdr[1-2]", memory=128000, state="idle"),
+                NodeRecord(name="cdr3", memory=128000, state="drain"),
+            ]
+        )
+    )
+
+    assert nodes[0].background_color == nodes[1].background_color
+    assert nodes[2].background_color == STATE_COLORS["drain"]
+    assert nodes[2].glyph_color == STATE_COLORS["drain"]
+    assert nodes[2].structure_key != nodes[0].structure_key
+    assert nodes[0].gpus is not nodes[1].gpus
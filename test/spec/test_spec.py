@@ -0,0 +1,78 @@
+import json
+import os
+
+import pytest
+
+from benchmarks.fleet import BELUGA, CEDAR, NARVAL
+from cluster_map import spec
+from cluster_map.architecture import Size
+from cluster_map.nodes import build_cluster
+from cluster_map.spec import cached_scene, load_scene, load_spec, parse_spec, spec_key
+
+SPECS = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "specs"
+)
+
+
+def small_spec(**changes):
+    data = {
+        "name": "small",
+        "grid": [2, 2],
+        "size": [300, 200],
+        "node_types": {"v100": {"gpu": "v100.jpg", "dimms": 4}},
+        "nodes": [{"type": "v100", "count": 3}, {"count": 1, "gpu": "p100.jpg"}],
+    }
+    data.update(changes)
+    return data
+
+
+@pytest.mark.parametrize("fleet", [CEDAR, BELUGA, NARVAL], ids=lambda fleet: fleet.name)
+def test_specs_match_fleets(fleet):
+    assert load_spec(os.path.join(SPECS, f"{fleet.name}.toml")) == fleet
+
+
+def test_parse_spec():
+    fleet = parse_spec(small_spec())
+
+    assert fleet.grid == Size(2, 2)
+    assert fleet.size == Size(300, 200)
+    assert [shape.count for shape in fleet.nodes] == [3, 1]
+    assert fleet.nodes[0].dimms == 4
+    assert fleet.nodes[1].dimms == 6
+
+    with pytest.raises(ValueError, match="Unknown node type"):
+        parse_spec(small_spec(nodes=[{"type": "a100", "count": 1}]))
+
+
+def test_cached_scene_skips_construction(tmp_path, monkeypatch):
+    path = tmp_path / "small.json"
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(small_spec(), file)
+
+    scene = load_scene(path, tmp_path / "cache")
+    cluster = build_cluster(load_spec(path))
+    assert scene.render().tobytes() == cluster.image.tobytes()
+
+    def fail(fleet):
+        raise AssertionError("The cluster was built again")
+
+    monkeypatch.setattr(spec, "build_cluster", fail)
+    cached = load_scene(path, tmp_path / "cache")
+
+    assert len(os.listdir(tmp_path / "cache")) == 1
+    assert cached.render().tobytes() == scene.render().tobytes()
+
+
+def test_spec_key_follows_content():
+    fleet = parse_spec(small_spec())
+
+    assert spec_key(fleet) == spec_key(parse_spec(small_spec()))
+    assert spec_key(fleet) != spec_key(parse_spec(small_spec(grid=[4, 1])))
+
+
+def test_changed_spec_is_compiled_again(tmp_path):
+    cached_scene(parse_spec(small_spec()), tmp_path)
+    scene = cached_scene(parse_spec(small_spec(size=[600, 200])), tmp_path)
+
+    assert len(os.listdir(tmp_path)) == 2
+    assert scene.size == Size(600, 200)